@@ -0,0 +1,131 @@
+"""Cold-start benchmark for the command-line entry points.
+
+Each command runs ``--repeat`` times in a fresh interpreter. The report shows
+the median and best wall time, plus the import cost and heavy packages
+(pandas, matplotlib) loaded, taken from one extra ``-X importtime`` run. The
+workflows run against the checked-in data with a warm stage cache, the way the
+scheduler sees them, so run each workflow once beforehand. Results go to
+``benchmarks/results/startup_latest.json`` and are compared against
+``benchmarks/startup_baseline.json``.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --save-baseline
+"""
+import argparse
+import json
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+RESULTS_PATH = BENCH_DIR / "results" / "startup_latest.json"
+BASELINE_PATH = BENCH_DIR / "startup_baseline.json"
+DEFAULT_TOLERANCE = 0.25
+HEAVY_MODULES = ("pandas", "matplotlib", "pyarrow")
+
+CLI = str(PROJECT_ROOT / "src" / "cli.py")
+COMMANDS: Dict[str, List[str]] = {
+    "cli --help": [CLI, "--help"],
+    "cli frailty": [CLI, "frailty"],
+    "cli viz": [CLI, "viz"],
+    "cli viz --summary-only": [CLI, "viz", "--summary-only"],
+    "students_viz.py (legacy)": [str(PROJECT_ROOT / "src" / "students_viz.py")],
+}
+
+
+def import_profile(command: List[str]) -> Dict[str, object]:
+    """Total top-level import time and which heavy packages were loaded, from ``-X importtime``."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *command], cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    total_us = 0
+    loaded = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            total_us += int(cumulative)
+        loaded.add(name.strip().split(".")[0])
+    return {"import_s": round(total_us / 1e6, 4), "heavy_imports": [name for name in HEAVY_MODULES if name in loaded]}
+
+
+def measure(name: str, repeat: int) -> Dict[str, object]:
+    command = COMMANDS[name]
+    walls = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, *command], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        walls.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            return {"command": name, "error": completed.stderr.strip().splitlines()[-1:]}
+    return {
+        "command": name,
+        "median_s": round(statistics.median(walls), 4),
+        "best_s": round(min(walls), 4),
+        **import_profile(command),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", default=",".join(COMMANDS), help="comma-separated command names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    names = [name.strip() for name in args.commands.split(",")]
+    unknown = set(names) - set(COMMANDS)
+    if unknown:
+        raise SystemExit(f"Unknown commands: {sorted(unknown)}; choose from {list(COMMANDS)}")
+
+    results = []
+    for name in names:
+        item = measure(name, args.repeat)
+        results.append(item)
+        if "error" in item:
+            print(f"{name:<28} ERROR {item['error']}")
+        else:
+            heavy = ",".join(item["heavy_imports"]) or "-"
+            print(
+                f"{name:<28} median {item['median_s']:7.3f}s  best {item['best_s']:7.3f}s  "
+                f"imports {item['import_s']:7.3f}s  heavy {heavy}"
+            )
+
+    report = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0], "results": results}
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    reference = {item["command"]: item for item in json.loads(args.baseline.read_text(encoding="utf-8"))["results"]}
+    regressions = [
+        f"{item['command']}: median {reference[item['command']]['median_s']}s -> {item['median_s']}s"
+        for item in results
+        if "error" not in item
+        and "error" not in reference.get(item["command"], {"error": True})
+        and item["median_s"] > reference[item["command"]]["median_s"] * (1 + args.tolerance)
+    ]
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{len(regressions)} regression(s) against {args.baseline.name} at {args.tolerance:.0%} tolerance")
+    return int(bool(regressions))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
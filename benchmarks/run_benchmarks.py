@@ -0,0 +1,250 @@
+"""Benchmark every pipeline stage on seeded synthetic data.
+
+Each (stage, size) pair runs in a fresh subprocess so peak RSS is attributable
+to that stage. Wall and CPU time are the best of ``--repeat`` runs; allocation
+peak comes from one extra run under ``tracemalloc``. Results are written as JSON
+to ``benchmarks/results/`` and compared against a stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1k,10k,100k
+    python benchmarks/run_benchmarks.py --stages pipeline.process --sizes 1M,10M,50M
+    python benchmarks/run_benchmarks.py --save-baseline
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / "results"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+DEFAULT_SIZES = "1k,10k,100k"
+# Relative slowdown (or memory growth) beyond which a result counts as a regression.
+DEFAULT_TOLERANCE = 0.25
+
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+
+def _students_processed(rows: int, seed: int):
+    import pipeline
+    from synthetic import synthetic_students
+
+    return pipeline.derive_columns(synthetic_students(rows, seed))
+
+
+def _viz_frame(rows: int, seed: int):
+    from synthetic import synthetic_students
+
+    df = synthetic_students(rows, seed)
+    df["overall_avg"] = df[["math score", "reading score", "writing score"]].mean(axis=1).round(2)
+    return df
+
+
+def _setup_process(rows: int, seed: int, workdir: Path) -> Tuple[Callable, tuple]:
+    import pipeline
+    from synthetic import synthetic_students
+
+    return pipeline.process, (synthetic_students(rows, seed), "csv", workdir)
+
+
+def _setup_analyze(rows: int, seed: int, workdir: Path) -> Tuple[Callable, tuple]:
+    import pipeline
+
+    return pipeline.analyze, (_students_processed(rows, seed), workdir)
+
+
+def _setup_enrich(rows: int, seed: int, workdir: Path) -> Tuple[Callable, tuple]:
+    import frailty_workflow
+    from synthetic import synthetic_frailty
+
+    return frailty_workflow.enrich_features, (synthetic_frailty(rows, seed),)
+
+
+def _setup_narrative(rows: int, seed: int, workdir: Path) -> Tuple[Callable, tuple]:
+    import students_viz
+    from grouped_stats import grouped_stats
+
+    df = _viz_frame(rows, seed)
+    stats = grouped_stats(df, students_viz.GROUP_KEYS)
+    prep = stats["test preparation course"].regression("reading score", "math score")
+    artifacts = {
+        "lunch_means": stats["lunch"].describe("overall_avg")["mean"],
+        "corr": df[["math score", "reading score", "writing score"]].corr(),
+        "trend_stats": {group: prep.loc[group].to_dict() for group in prep.index},
+    }
+    # Time the narrative on its own: the engine is rebuilt inside, as in a cold call.
+    return students_viz.build_narrative, (df, artifacts)
+
+
+def _figure_setup(name: str):
+    def setup(rows: int, seed: int, workdir: Path) -> Tuple[Callable, tuple]:
+        import students_viz
+
+        return students_viz.FIGURE_FUNCTIONS[name], (_viz_frame(rows, seed), None, workdir)
+
+    return setup
+
+
+STAGES: Dict[str, Callable[[int, int, Path], Tuple[Callable, tuple]]] = {
+    "pipeline.process": _setup_process,
+    "pipeline.analyze": _setup_analyze,
+    "frailty.enrich_features": _setup_enrich,
+    "students_viz.build_narrative": _setup_narrative,
+    **{f"students_viz.{name}": _figure_setup(name) for name in ("v1", "v2", "v3", "v4", "v5")},
+}
+
+
+def measure(stage: str, rows: int, seed: int, repeat: int) -> Dict[str, object]:
+    """Run one stage in this process and return its measurements."""
+    from instrumentation import peak_rss_mb, reset_peak_rss, rss_mb
+    import stage_cache
+
+    stage_cache.configure(enabled=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        func, args = STAGES[stage](rows, seed, Path(tmp))
+        rss_reset = reset_peak_rss()
+        rss_before = rss_mb() if rss_reset else None
+        wall, cpu = float("inf"), float("inf")
+        for _ in range(repeat):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            func(*args)
+            wall = min(wall, time.perf_counter() - wall_start)
+            cpu = min(cpu, time.process_time() - cpu_start)
+        peak_rss = peak_rss_mb()
+
+        tracemalloc.start()
+        func(*args)
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "stage": stage,
+        "rows": rows,
+        "wall_s": round(wall, 6),
+        "cpu_s": round(cpu, 6),
+        "peak_rss_mb": round(peak_rss, 2),
+        "peak_rss_includes_setup": not rss_reset,
+        "stage_rss_mb": round(peak_rss - rss_before, 2) if rss_before is not None else None,
+        "alloc_peak_mb": round(alloc_peak / 1e6, 3),
+    }
+
+
+def run_isolated(stage: str, rows: int, seed: int, repeat: int) -> Dict[str, object]:
+    command = [sys.executable, __file__, "--worker", stage, str(rows), "--seed", str(seed), "--repeat", str(repeat)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"stage": stage, "rows": rows, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _metadata() -> Dict[str, object]:
+    import matplotlib
+    import numpy
+    import pandas
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+def compare(results: List[Dict[str, object]], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """Describe every result slower or hungrier than the baseline by more than ``tolerance``."""
+    reference = {(item["stage"], item["rows"]): item for item in baseline["results"] if "error" not in item}
+    regressions = []
+    for item in results:
+        base = reference.get((item["stage"], item["rows"]))
+        if base is None or "error" in item:
+            continue
+        for metric in ("wall_s", "peak_rss_mb", "alloc_peak_mb"):
+            if base[metric] > 0 and item[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{item['stage']} @ {item['rows']:,} rows: {metric} {base[metric]} -> {item[metric]} "
+                    f"(+{(item[metric] / base[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated row counts, e.g. 1k,10k,1M,50M")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated stage names")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement (best is kept)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--worker", nargs=2, metavar=("STAGE", "ROWS"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    if args.worker:
+        stage, rows = args.worker
+        print(json.dumps(measure(stage, int(rows), args.seed, args.repeat)))
+        return 0
+
+    from synthetic import parse_size
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    stages = [stage.strip() for stage in args.stages.split(",")]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise SystemExit(f"Unknown stages: {sorted(unknown)}; choose from {list(STAGES)}")
+
+    results = []
+    for stage in stages:
+        for rows in sizes:
+            item = run_isolated(stage, rows, args.seed, args.repeat)
+            results.append(item)
+            if "error" in item:
+                print(f"{stage:<30} {rows:>12,}  ERROR {item['error']}")
+            else:
+                print(
+                    f"{stage:<30} {rows:>12,}  wall {item['wall_s']:9.4f}s  cpu {item['cpu_s']:9.4f}s  "
+                    f"rss {item['peak_rss_mb']:9.1f}MB  alloc {item['alloc_peak_mb']:9.1f}MB"
+                )
+
+    report = {"meta": _metadata(), "results": results}
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = report["meta"]["timestamp"].replace(":", "")
+    for path in (RESULTS_DIR / f"{stamp}.json", RESULTS_DIR / "latest.json"):
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{len(regressions)} regression(s) against {args.baseline.name} at {args.tolerance:.0%} tolerance")
+    return int(bool(regressions))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
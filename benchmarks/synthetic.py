@@ -0,0 +1,50 @@
+"""Seeded synthetic generators matching the raw dataset schemas."""
+import numpy as np
+import pandas as pd
+
+STUDENT_CATEGORIES = {
+    "gender": (["female", "male"], [0.518, 0.482]),
+    "race/ethnicity": (["group A", "group B", "group C", "group D", "group E"], [0.089, 0.19, 0.319, 0.262, 0.14]),
+    "parental level of education": (
+        ["some college", "associate's degree", "high school", "some high school", "bachelor's degree", "master's degree"],
+        [0.226, 0.222, 0.196, 0.179, 0.118, 0.059],
+    ),
+    "lunch": (["standard", "free/reduced"], [0.645, 0.355]),
+    "test preparation course": (["none", "completed"], [0.642, 0.358]),
+}
+
+
+def parse_size(text: str) -> int:
+    """``"1k"`` -> 1000, ``"50M"`` -> 50_000_000."""
+    text = text.strip()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1].lower(), 1)
+    return int(float(text[:-1] if multiplier > 1 else text) * multiplier)
+
+
+def synthetic_students(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Random frame with the ``students_performance.csv`` schema and realistic, correlated scores."""
+    rng = np.random.default_rng(seed)
+    data = {
+        column: pd.Categorical.from_codes(rng.choice(len(labels), rows, p=probs), labels).astype(object)
+        for column, (labels, probs) in STUDENT_CATEGORIES.items()
+    }
+    ability = rng.normal(66, 13, rows)
+    ability += np.where(data["test preparation course"] == "completed", 5, 0)
+    ability += np.where(data["lunch"] == "standard", 4, -4)
+    for column, noise in (("math score", 6), ("reading score", 5), ("writing score", 5)):
+        data[column] = np.clip(np.rint(ability + rng.normal(0, noise, rows)), 0, 100).astype("int64")
+    return pd.DataFrame(data)
+
+
+def synthetic_frailty(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Random frame with the ``frailty_data.csv`` schema."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "Height_in": rng.normal(68.5, 3.0, rows).round(1),
+            "Weight_lb": rng.integers(95, 260, rows),
+            "Age_yr": rng.integers(18, 95, rows),
+            "Grip_kg": rng.integers(10, 55, rows),
+            "Frailty": rng.choice(np.array(["Y", "N"], dtype=object), rows, p=[0.3, 0.7]),
+        }
+    )
@@ -0,0 +1,190 @@
+"""Pluggable storage for processed artifacts: CSV, Parquet, or Arrow IPC.
+
+Artifacts are addressed by a base path without suffix; the format picks the
+extension. A dtype mapping travels with each artifact so compact dtypes
+(categoricals, int8 scores and one-hots) survive a round trip even through CSV.
+Parquet and Arrow reads support column projection and predicate pushdown.
+"""
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from output_writer import atomic_write, temporary_path
+
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+Filter = Tuple[str, str, Any]
+
+
+def artifact_path(base: Path, fmt: str = "csv") -> Path:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown artifact format {fmt!r}; expected one of {sorted(FORMATS)}")
+    return base.with_suffix(FORMATS[fmt])
+
+
+def _require_pyarrow(fmt: str):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(f"The {fmt!r} artifact format requires pyarrow (pip install pyarrow)") from exc
+
+
+def apply_dtypes(df: pd.DataFrame, dtypes: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    """Cast columns to their compact dtypes; integer targets fall back to nullable ints on gaps."""
+    if not dtypes:
+        return df
+    casts = {}
+    for column, dtype in dtypes.items():
+        if column not in df.columns:
+            continue
+        if isinstance(dtype, str) and dtype.startswith(("int", "uint")) and df[column].isna().any():
+            dtype = "UInt" + dtype[4:] if dtype.startswith("uint") else "Int" + dtype[3:]
+        casts[column] = dtype
+    return df.astype(casts)
+
+
+def write_table(df: pd.DataFrame, base: Path, fmt: str = "csv", dtypes: Optional[Dict[str, Any]] = None) -> Path:
+    """Persist ``df`` as ``base`` + format suffix (atomically) and return the written path."""
+    path = artifact_path(base, fmt)
+    df = apply_dtypes(df, dtypes)
+    if fmt != "csv":
+        _require_pyarrow(fmt)
+
+    def write(tmp: Path) -> None:
+        if fmt == "csv":
+            df.to_csv(tmp, index=False, encoding="utf-8")
+        elif fmt == "parquet":
+            df.to_parquet(tmp, index=False)
+        else:
+            df.reset_index(drop=True).to_feather(tmp)
+
+    atomic_write(path, write)
+    return path
+
+
+class TableWriter:
+    """Incrementally append chunks to one artifact (used by the streaming paths).
+
+    Chunks go to a temporary sibling that ``close`` renames into place, so readers
+    never see a half-written artifact; a failed stream leaves the old one intact.
+    """
+
+    def __init__(self, base: Path, fmt: str = "csv", dtypes: Optional[Dict[str, Any]] = None) -> None:
+        self.path = artifact_path(base, fmt)
+        self._tmp = temporary_path(self.path)
+        self.fmt = fmt
+        self.dtypes = dtypes
+        self._writer = None
+        self._schema = None
+        self._chunks = 0
+        if fmt != "csv":
+            _require_pyarrow(fmt)
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        chunk = apply_dtypes(chunk, self.dtypes)
+        if self.fmt == "csv":
+            if self._chunks == 0:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            chunk.to_csv(self._tmp, mode="w" if self._chunks == 0 else "a", header=self._chunks == 0, index=False)
+        else:
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self.fmt == "parquet":
+                    import pyarrow.parquet as pq
+
+                    self._writer = pq.ParquetWriter(self._tmp, table.schema)
+                else:
+                    self._writer = pa.ipc.new_file(self._tmp, table.schema)
+            else:
+                table = table.cast(self._schema)
+            self._writer.write_table(table)
+        self._chunks += 1
+
+    def close(self, commit: bool = True) -> None:
+        """Finish the artifact and rename it into place (``commit=False`` discards it)."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if not self._tmp.exists():
+            return
+        if commit:
+            os.replace(self._tmp, self.path)
+        else:
+            self._tmp.unlink()
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(commit=exc_type is None)
+
+
+def _filter_mask(df: pd.DataFrame, filters: Iterable[Filter]) -> pd.Series:
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        series = df[column]
+        if op in ("=", "=="):
+            mask &= series == value
+        elif op == "!=":
+            mask &= series != value
+        elif op == "<":
+            mask &= series < value
+        elif op == "<=":
+            mask &= series <= value
+        elif op == ">":
+            mask &= series > value
+        elif op == ">=":
+            mask &= series >= value
+        elif op == "in":
+            mask &= series.isin(value)
+        elif op == "not in":
+            mask &= ~series.isin(value)
+        else:
+            raise ValueError(f"Unsupported filter operator {op!r}")
+    return mask
+
+
+def read_table(
+    base: Path,
+    fmt: str = "csv",
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[List[Filter]] = None,
+    dtypes: Optional[Dict[str, Any]] = None,
+) -> pd.DataFrame:
+    """Load an artifact, reading only ``columns`` and rows matching every ``filters`` tuple.
+
+    Filters are ``(column, op, value)`` tuples combined with AND. For Parquet and
+    Arrow they are pushed down into the scan; for CSV they are applied after a
+    projected read.
+    """
+    path = artifact_path(base, fmt)
+    filters = list(filters or [])
+    if fmt == "csv":
+        wanted = None
+        if columns is not None:
+            wanted = list(dict.fromkeys(list(columns) + [column for column, _, _ in filters]))
+        csv_dtypes = {col: dtype for col, dtype in (dtypes or {}).items() if wanted is None or col in wanted}
+        # Integers are cast after the read so missing values can fall back to nullable dtypes.
+        parse_dtypes = {col: dtype for col, dtype in csv_dtypes.items() if not str(dtype).startswith(("int", "uint"))}
+        df = pd.read_csv(path, usecols=wanted, dtype=parse_dtypes or None)
+        df = apply_dtypes(df, csv_dtypes)
+        if filters:
+            df = df.loc[_filter_mask(df, filters)].reset_index(drop=True)
+        if columns is not None:
+            df = df[list(columns)]
+        return df
+
+    _require_pyarrow(fmt)
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    dataset = ds.dataset(path, format="parquet" if fmt == "parquet" else "ipc")
+    expression = pq.filters_to_expression(filters) if filters else None
+    table = dataset.to_table(columns=list(columns) if columns is not None else None, filter=expression)
+    return apply_dtypes(table.to_pandas(), dtypes)
@@ -0,0 +1,149 @@
+"""Cohort fan-out: run the student pipeline over many raw partitions in a process pool.
+
+Each partition (one raw CSV per school/year) gets its own output tree::
+
+    <out_root>/<partition>/processed/   ingested + processed artifacts
+    <out_root>/<partition>/analysis/    score summary, prep-course table, report, figures
+
+and the per-partition results are combined into ``<out_root>/cohort_summary.csv``.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import os
+from pathlib import Path
+import time
+import traceback
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+import pipeline
+import stage_cache
+from artifact_store import FORMATS
+from instrumentation import run_manifest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BATCH_OUTPUT_DIR = PROJECT_ROOT / "outputs" / "cohorts"
+SUMMARY_NAME = "cohort_summary.csv"
+
+
+def discover_partitions(source: str) -> List[Path]:
+    """Expand a directory (every ``*.csv`` below it) or a glob pattern into raw partition files."""
+    path = Path(source)
+    if path.is_dir():
+        matches = path.rglob("*.csv")
+    else:
+        matches = (Path(match) for match in glob.glob(source, recursive=True))
+    return sorted(match for match in matches if match.is_file())
+
+
+def partition_names(paths: List[Path]) -> Dict[Path, str]:
+    """Name partitions by their path below the common root so equal file stems don't collide."""
+    if not paths:
+        return {}
+    root = Path(os.path.commonpath([str(path.resolve().parent) for path in paths]))
+    return {path: "__".join(path.resolve().relative_to(root).with_suffix("").parts) for path in paths}
+
+
+def run_partition(
+    raw_path: Path, name: str, out_root: Path, fmt: str = "csv", figures: bool = False, force: bool = False
+) -> Dict[str, object]:
+    """Run ingest -> process -> analyze (and optionally the figures) for one partition.
+
+    Failures are captured in the returned record instead of raised, so one bad
+    partition never takes down the pool.
+    """
+    stage_cache.configure(force=force)
+    started = time.perf_counter()
+    processed_dir = out_root / name / "processed"
+    analysis_dir = out_root / name / "analysis"
+    record: Dict[str, object] = {"partition": name, "source": str(raw_path)}
+    try:
+        with run_manifest(f"cohort:{name}", analysis_dir / pipeline.MANIFEST_NAME):
+            score_summary, prep_course = pipeline.run_pipeline(
+                raw_path, fmt=fmt, processed_dir=processed_dir, analysis_dir=analysis_dir
+            )
+            if figures:
+                import students_viz
+
+                students_viz.run_visualizations(
+                    fmt,
+                    raw_path=raw_path,
+                    output_dir=analysis_dir,
+                    report_path=analysis_dir / "figures_report.md",
+                    processed_base=processed_dir / pipeline.PROCESSED_NAME,
+                )
+        record.update(status="ok", students=int(prep_course["count"].sum()))
+        for column in pipeline.SCORE_COLUMNS:
+            for stat in ("mean", "median", "std"):
+                record[f"{column}_{stat}"] = score_summary.loc[stat, column]
+        for group, mean in prep_course["mean"].items():
+            record[f"prep_{group}_mean"] = mean
+    except Exception as exc:  # noqa: BLE001 - reported per partition
+        record.update(status="failed", error=f"{type(exc).__name__}: {exc}", traceback=traceback.format_exc())
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def run_batch(
+    source: str,
+    out_root: Path = BATCH_OUTPUT_DIR,
+    workers: int = 0,
+    fmt: str = "csv",
+    figures: bool = False,
+    force: bool = False,
+) -> pd.DataFrame:
+    """Fan partitions out to a process pool, report progress, and write the combined summary."""
+    paths = discover_partitions(source)
+    if not paths:
+        raise FileNotFoundError(f"No raw partitions match {source!r}")
+    names = partition_names(paths)
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_partition, path, names[path], out_root, fmt, figures, force): path for path in paths
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            records.append(record)
+            if record["status"] == "ok":
+                detail = f"{record['students']} students"
+            else:
+                detail = record["error"]
+            print(f"[{done}/{len(paths)}] {record['status']:<6} {record['partition']} ({detail}, {record['seconds']:.2f}s)")
+
+    summary = pd.DataFrame(records).drop(columns=["traceback"], errors="ignore")
+    summary = summary.sort_values("partition").reset_index(drop=True)
+    if {"prep_completed_mean", "prep_none_mean"}.issubset(summary.columns):
+        summary["prep_gain"] = (summary["prep_completed_mean"] - summary["prep_none_mean"]).round(2)
+    if "students" in summary.columns:
+        summary["students"] = summary["students"].astype("Int64")
+    out_root.mkdir(parents=True, exist_ok=True)
+    summary.to_csv(out_root / SUMMARY_NAME, index=False)
+
+    failures = summary[summary["status"] != "ok"]
+    print(f"{len(summary) - len(failures)} of {len(summary)} partitions succeeded; summary saved to {out_root / SUMMARY_NAME}")
+    return summary
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory of raw partition CSVs or a glob pattern (quote it)")
+    parser.add_argument("--out", type=Path, default=BATCH_OUTPUT_DIR, help="root directory for per-partition outputs")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 = all cores)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv", help="storage format for processed artifacts")
+    parser.add_argument("--figures", action="store_true", help="also render V1-V5 and the narrative per partition")
+    parser.add_argument("--force", action="store_true", help="recompute every stage even when its cache entry is fresh")
+    return parser.parse_args(argv)
+
+
+def run_cli(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    result = run_batch(args.source, args.out, args.workers, args.format, args.figures, args.force)
+    return int((result["status"] != "ok").any())
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_cli())
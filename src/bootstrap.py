@@ -0,0 +1,210 @@
+"""Vectorized, parallel bootstrap confidence intervals for narrative statistics.
+
+Resampling N rows with replacement only changes how often each distinct row
+appears. The data are therefore compressed once to their unique rows and
+frequencies, and a resample is drawn as a multinomial count vector over those
+rows. That is the same distribution as the row-level bootstrap, but a batch of
+B resamples costs O(B x unique rows), not O(B x N). Scores, flags and grip
+strengths have few distinct values, so on a 1M-row frame 10k resamples of a
+mean difference take well under a second and a slope (up to 101 x 101 score
+pairs) a few seconds.
+
+Statistics are plain functions ``statistic(weights, table) -> values`` that
+evaluate a ``(B, U)`` weight matrix against the ``(U, k)`` table of unique rows
+in one vectorized pass. Batches draw from ``SeedSequence(seed, spawn_key=(i,))``
+and are evaluated in fixed-size rounds, so results depend on the seed and never
+on the number of worker processes. Resampling stops early once neither
+interval endpoint moves by more than ``tolerance`` times the interval width
+between rounds.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_RESAMPLES = 10_000
+DEFAULT_LEVEL = 0.95
+DEFAULT_SEED = 0
+BATCH_SIZE = 250
+ROUND_BATCHES = 4
+MIN_RESAMPLES = 2_000
+TOLERANCE = 0.01
+
+Statistic = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+@dataclass
+class Interval:
+    """Point estimate with a percentile bootstrap interval."""
+
+    estimate: float
+    low: float
+    high: float
+    level: float
+    resamples: int
+
+    def describe(self, fmt: str = ".1f") -> str:
+        """``"95% CI 1.2 to 3.4"``."""
+        return f"{self.level:.0%} CI {self.low:{fmt}} to {self.high:{fmt}}"
+
+
+def compress(*columns) -> Tuple[np.ndarray, np.ndarray]:
+    """Unique rows of the stacked ``columns`` (sorted lexicographically) and their frequencies.
+
+    Rows with a missing value in any column are dropped.
+    """
+    values = [np.asarray(column, dtype="float64") for column in columns]
+    keep = ~np.any([np.isnan(column) for column in values], axis=0)
+    uniques, codes = zip(*(np.unique(column[keep], return_inverse=True) for column in values))
+    key = np.zeros(int(keep.sum()), dtype="int64")
+    for unique, code in zip(uniques, codes):
+        key = key * len(unique) + code
+    keys, counts = np.unique(key, return_counts=True)
+    table = np.empty((len(keys), len(values)))
+    for position in reversed(range(len(values))):
+        keys, code = np.divmod(keys, len(uniques[position]))
+        table[:, position] = uniques[position][code]
+    return table, counts
+
+
+def table_from_counts(counts: Dict[Tuple[float, ...], int]) -> Tuple[np.ndarray, np.ndarray]:
+    """``compress`` output from already aggregated ``{row: frequency}`` counts (e.g. persisted state)."""
+    rows = sorted(counts)
+    return np.array(rows, dtype="float64").reshape(len(rows), -1), np.array([counts[row] for row in rows], dtype="int64")
+
+
+def _weighted_sums(weights: np.ndarray, *terms: np.ndarray) -> Tuple[np.ndarray, ...]:
+    return tuple(weights @ term for term in terms)
+
+
+def mean_difference(weights: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """mean(value | flag == 1) - mean(value | flag == 0) for a ``[flag, value]`` table."""
+    flag, value = table[:, 0] == 1, table[:, 1]
+    n1, s1, n0, s0 = _weighted_sums(weights, flag * 1.0, flag * value, ~flag * 1.0, ~flag * value)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return s1 / n1 - s0 / n0
+
+
+def _weighted_quantile(weights: np.ndarray, values: np.ndarray, q: float) -> np.ndarray:
+    """Linear-interpolated quantile (NumPy default) of each row's weighted sample; ``values`` ascending."""
+    cumulative = np.cumsum(weights, axis=1)
+    n = cumulative[:, -1]
+    position = q * (n - 1)
+    lower = np.floor(position)
+    # The value at 0-based rank r is the first one whose cumulative count exceeds r.
+    low_index = np.minimum((cumulative <= lower[:, None]).sum(axis=1), len(values) - 1)
+    high_index = np.minimum((cumulative <= lower[:, None] + 1).sum(axis=1), len(values) - 1)
+    low_values = values[low_index]
+    result = low_values + (values[high_index] - low_values) * (position - lower)
+    return np.where(n > 0, result, np.nan)
+
+
+def iqr_difference(weights: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """IQR(value | flag == 1) - IQR(value | flag == 0) for a ``[flag, value]`` table sorted by flag, value."""
+    spreads = []
+    for flag in (1, 0):
+        rows = table[:, 0] == flag
+        group_weights, values = weights[:, rows], table[rows, 1]
+        spreads.append(_weighted_quantile(group_weights, values, 0.75) - _weighted_quantile(group_weights, values, 0.25))
+    return spreads[0] - spreads[1]
+
+
+def slope(weights: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """Least-squares slope of y on x for an ``[x, y]`` table."""
+    x, y = table[:, 0], table[:, 1]
+    n, sx, sy, sxx, sxy = _weighted_sums(weights, np.ones_like(x), x, y, x * x, x * y)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (n * sxy - sx * sy) / (n * sxx - sx * sx)
+
+
+def correlation(weights: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """Pearson correlation of an ``[x, y]`` table."""
+    x, y = table[:, 0], table[:, 1]
+    n, sx, sy, sxx, syy, sxy = _weighted_sums(weights, np.ones_like(x), x, y, x * x, y * y, x * y)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+
+
+def _resample_batch(statistic: Statistic, table: np.ndarray, counts: np.ndarray, seed: int, index: int, size: int) -> np.ndarray:
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    weights = rng.multinomial(int(counts.sum()), counts / counts.sum(), size=size).astype("float64")
+    return statistic(weights, table)
+
+
+class Bootstrap:
+    """Percentile bootstrap intervals with shared settings and an optional worker pool.
+
+    Use as a context manager when ``workers`` > 1 so the pool is shut down.
+    """
+
+    def __init__(
+        self,
+        resamples: int = DEFAULT_RESAMPLES,
+        level: float = DEFAULT_LEVEL,
+        seed: int = DEFAULT_SEED,
+        workers: int = 1,
+        batch_size: int = BATCH_SIZE,
+        tolerance: float = TOLERANCE,
+    ) -> None:
+        self.resamples = resamples
+        self.level = level
+        self.seed = seed
+        self.workers = workers
+        self.batch_size = batch_size
+        self.tolerance = tolerance
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __fingerprint__(self, digest) -> None:
+        # Cache keys cover the settings that shape the intervals, not ``workers``.
+        settings = (self.resamples, self.level, self.seed, self.batch_size, self.tolerance)
+        digest.update(repr(settings).encode())
+
+    def __enter__(self) -> "Bootstrap":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _map(self, statistic: Statistic, table: np.ndarray, counts: np.ndarray, indices: Sequence[int]):
+        sizes = [min(self.batch_size, self.resamples - index * self.batch_size) for index in indices]
+        if self.workers > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            repeat = len(indices)
+            return list(
+                self._pool.map(
+                    _resample_batch, [statistic] * repeat, [table] * repeat, [counts] * repeat,
+                    [self.seed] * repeat, indices, sizes,
+                )
+            )
+        return [_resample_batch(statistic, table, counts, self.seed, index, size) for index, size in zip(indices, sizes)]
+
+    def _bounds(self, samples: np.ndarray) -> Tuple[float, float]:
+        tail = (1 - self.level) / 2 * 100
+        low, high = np.nanpercentile(samples, [tail, 100 - tail])
+        return float(low), float(high)
+
+    def interval_from_table(self, statistic: Statistic, table: np.ndarray, counts: np.ndarray) -> Interval:
+        """Interval for ``statistic`` over data already compressed to ``(table, counts)``."""
+        estimate = float(statistic(counts[None, :].astype("float64"), table)[0])
+        if counts.sum() == 0 or self.resamples <= 0:
+            return Interval(estimate, float("nan"), float("nan"), self.level, 0)
+        batches = -(-self.resamples // self.batch_size)
+        samples = np.empty(0)
+        bounds = None
+        for start in range(0, batches, ROUND_BATCHES):
+            indices = list(range(start, min(start + ROUND_BATCHES, batches)))
+            samples = np.concatenate([samples, *self._map(statistic, table, counts, indices)])
+            previous, bounds = bounds, self._bounds(samples)
+            if previous is not None and samples.size >= MIN_RESAMPLES:
+                width = bounds[1] - bounds[0]
+                if max(abs(bounds[0] - previous[0]), abs(bounds[1] - previous[1])) <= self.tolerance * width:
+                    break
+        return Interval(estimate, bounds[0], bounds[1], self.level, int(samples.size))
+
+    def interval(self, statistic: Statistic, *columns) -> Interval:
+        """Interval for ``statistic`` over the rows formed by ``columns`` (see ``compress``)."""
+        return self.interval_from_table(statistic, *compress(*columns))
@@ -0,0 +1,53 @@
+"""Single command-line entry point for the project workflows.
+
+    python src/cli.py pipeline [--stream] [--backend matrix] [--format parquet] ...
+    python src/cli.py frailty [--incremental] [--float-dtype float32] ...
+    python src/cli.py viz [--summary-only] [--workers N] [--from-processed csv] ...
+    python src/cli.py batch SOURCE [--workers N] [--figures] ...
+
+Choosing a command loads only the standard library, so ``python src/cli.py
+--help`` and usage errors are instant. The chosen command's workflow module (and
+with it pandas and pyarrow) is imported before its options are parsed, because
+that module owns its parser: ``python src/cli.py viz --help`` lists the viz
+flags but pays for those imports too. matplotlib is
+imported only once a figure is actually rendered. It never loads for
+``--summary-only`` or for figures restored from the stage cache, and it is
+pinned to the Agg backend without probing for a GUI.
+"""
+import argparse
+import importlib
+import os
+import sys
+from typing import List, Optional
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+COMMANDS = {
+    "pipeline": ("pipeline", "StudentsPerformance ingest -> process -> analyze"),
+    "frailty": ("frailty_workflow", "frailty features, processed artifact and findings.md"),
+    "viz": ("students_viz", "figures V1-V5 and the analysis report narrative"),
+    "batch": ("batch", "the student pipeline over many raw partitions"),
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "command",
+        choices=COMMANDS,
+        help="; ".join(f"{name}: {summary}" for name, (_, summary) in COMMANDS.items()),
+    )
+    parser.add_argument("options", nargs=argparse.REMAINDER, help="options for the command (see `<command> --help`)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    module = importlib.import_module(COMMANDS[args.command][0])
+    # Let the subcommand's own parser report itself as "cli.py <command>" in usage and errors.
+    sys.argv[0] = f"{os.path.basename(sys.argv[0])} {args.command}"
+    return int(module.run_cli(args.options) or 0)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+"""Shared single-read loader for the StudentsPerformance dataset.
+
+``pipeline`` and ``students_viz`` both start from the same raw CSV. The file is
+parsed and validated against ``schema.STUDENTS_SCHEMA`` once per process (keyed
+on path, size and mtime) into compact dtypes: int8 scores and categorical
+labels. Malformed rows are set aside in ``StudentsDataset.quarantine``. The
+three-subject mean is derived once and both workflows get their view of the
+data from the same columns: raw names for the figures and snake_case names for
+the pipeline. Views are built with ``assign`` / ``rename``, which under pandas
+copy-on-write alias the parsed column buffers instead of copying them.
+"""
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from schema import STUDENTS_SCHEMA, ValidationResult
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+RAW_PATH = PROJECT_ROOT / "data" / "raw" / "students_performance.csv"
+
+SCORE_COLUMNS = ["math score", "reading score", "writing score"]
+STUDENT_DTYPES = {column.name: column.dtype for column in STUDENTS_SCHEMA.columns}
+COLUMN_RENAMES = {
+    "race/ethnicity": "race_ethnicity",
+    "parental level of education": "parental_education",
+    "test preparation course": "test_preparation_course",
+    "math score": "math_score",
+    "reading score": "reading_score",
+    "writing score": "writing_score",
+}
+DERIVED_COLUMNS = ("average_score", "overall_avg")
+
+
+def read_students(raw_path: Path) -> ValidationResult:
+    """Parse the raw CSV, split off malformed rows and narrow the rest to ``STUDENT_DTYPES``."""
+    return STUDENTS_SCHEMA.read_csv(raw_path)
+
+
+class StudentsDataset:
+    """One parsed copy of the raw file's valid rows plus lazily derived columns shared by every view."""
+
+    def __init__(self, frame: pd.DataFrame, quarantine: Optional[pd.DataFrame] = None) -> None:
+        self.frame = frame
+        # Rejected rows with their raw values and a ``reasons`` column (see ``schema.write_quarantine``).
+        self.quarantine = frame.iloc[:0] if quarantine is None else quarantine
+
+    @cached_property
+    def average_score(self) -> pd.Series:
+        return self.frame[SCORE_COLUMNS].mean(axis=1)
+
+    @cached_property
+    def overall_avg(self) -> pd.Series:
+        return self.average_score.round(2)
+
+    def view(self, naming: str = "raw", derived: Iterable[str] = ()) -> pd.DataFrame:
+        """The raw columns (``naming="raw"`` or ``"snake"``) plus the requested derived columns."""
+        unknown = set(derived) - set(DERIVED_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown derived columns {sorted(unknown)}; expected a subset of {DERIVED_COLUMNS}")
+        frame = self.frame.assign(**{name: getattr(self, name) for name in derived})
+        if naming == "snake":
+            frame = frame.rename(columns=COLUMN_RENAMES)
+        elif naming != "raw":
+            raise ValueError(f"Unknown naming {naming!r}; expected 'raw' or 'snake'")
+        return frame
+
+
+@lru_cache(maxsize=4)
+def _load(path: str, size: int, mtime_ns: int) -> StudentsDataset:
+    result = read_students(Path(path))
+    return StudentsDataset(result.valid, result.quarantine)
+
+
+def load_students(raw_path: Path = RAW_PATH) -> StudentsDataset:
+    """The parsed dataset for ``raw_path``, re-parsed only when the file changes."""
+    path = Path(raw_path).resolve()
+    stat = path.stat()
+    return _load(str(path), stat.st_size, stat.st_mtime_ns)
@@ -1,15 +1,50 @@
 """Frailty workflow: ingest -> process -> analyze."""
+import argparse
+import hashlib
+import io
+import json
+import os
 from pathlib import Path
 import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
+from artifact_store import FORMATS, apply_dtypes, artifact_path, write_table
+from bootstrap import DEFAULT_RESAMPLES, DEFAULT_SEED, Bootstrap, Interval, compress, correlation, table_from_counts
+from instrumentation import PROFILERS, instrumented, run_manifest
+from output_writer import write_text
+from running_stats import QuantileSketch, RunningCovariance, RunningMoments
+from schema import FRAILTY_SCHEMA, count_quarantined, quarantine_path, write_quarantine
+import stage_cache
+from stage_cache import cached_stage
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 RAW_PATH = PROJECT_ROOT / "data" / "raw" / "frailty_data.csv"
-PROCESSED_PATH = PROJECT_ROOT / "data" / "processed" / "frailty_processed.csv"
+PROCESSED_BASE = PROJECT_ROOT / "data" / "processed" / "frailty_processed"
+ARTIFACT_FORMAT = "csv"
+STATE_PATH = PROJECT_ROOT / "data" / "processed" / "frailty_state.json"
+MANIFEST_PATH = PROJECT_ROOT / "data" / "processed" / "frailty_manifest.json"
+QUARANTINE_PATH = quarantine_path(PROJECT_ROOT / "data" / "processed", FRAILTY_SCHEMA.name)
+MEDIAN_RESOLUTION = 1e-4
 REPORTS_DIR = PROJECT_ROOT / "reports"
 FINDINGS_PATH = REPORTS_DIR / "findings.md"
 
 AGE_GROUP_LABELS = ["<30", "30\u201345", "46\u201360", ">60"]
+# Bin edges for ``np.searchsorted(..., side="right")``: ages < 30 | 30-45 | >45-60 | > 60.
+# The upper brackets are closed on the right, so their edges sit just above 45 and 60.
+AGE_GROUP_EDGES = np.array([30.0, np.nextafter(45.0, np.inf), np.nextafter(60.0, np.inf)])
+FEATURE_FLOAT_DTYPE = "float64"
+
+PROCESSED_DTYPES = {
+    "Frailty": "category",
+    "AgeGroup": pd.CategoricalDtype(AGE_GROUP_LABELS, ordered=True),
+    "Frailty_binary": "int8",
+    **{f"AgeGroup_{label}": "int8" for label in AGE_GROUP_LABELS},
+}
+# Parsed as float64 so fractional measurements validate; whole values keep their raw spelling in CSV.
+WHOLE_NUMBER_COLUMNS = ["Weight_lb", "Grip_kg"]
 
 
 def categorize_age(age: float) -> str:
@@ -22,34 +57,91 @@ def categorize_age(age: float) -> str:
     return AGE_GROUP_LABELS[3]
 
 
+@instrumented("load_data")
 def load_data() -> pd.DataFrame:
-    return pd.read_csv(RAW_PATH)
+    """The raw rows that pass ``FRAILTY_SCHEMA``; the rest go to the quarantine file with their reasons."""
+    checked = FRAILTY_SCHEMA.read_csv(RAW_PATH)
+    write_quarantine(checked.quarantine, QUARANTINE_PATH)
+    return checked.valid
 
 
-def enrich_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["Height_m"] = df["Height_in"] * 0.0254
-    df["Weight_kg"] = df["Weight_lb"] * 0.45359237
-    df["BMI"] = (df["Weight_kg"] / (df["Height_m"] ** 2)).round(2)
-    df["AgeGroup"] = df["Age_yr"].apply(categorize_age)
-    df["Frailty_binary"] = (df["Frailty"].str.upper() == "Y").astype("int8")
-
-    age_group_cat = pd.Categorical(df["AgeGroup"], categories=AGE_GROUP_LABELS, ordered=True)
-    age_dummies = pd.get_dummies(age_group_cat, prefix="AgeGroup")
-    for label in AGE_GROUP_LABELS:
-        col_name = f"AgeGroup_{label}"
-        df[col_name] = age_dummies.get(col_name, 0).astype("int8")
+# Derived features in evaluation order; each receives the frame built so far and the float dtype.
+DERIVED_FEATURES: List[Tuple[str, Callable[[pd.DataFrame, str], object]]] = []
+
+
+def _csv_spelling(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` with the all-whole ``WHOLE_NUMBER_COLUMNS`` as Int64, so CSV prints ``112`` rather than ``112.0``."""
+    casts = {column: "Int64" for column in WHOLE_NUMBER_COLUMNS if column in df and (df[column].dropna() % 1 == 0).all()}
+    return df.astype(casts)
+
+
+def derived_feature(name: str):
+    """Register a vectorized derived column; later features may read earlier ones."""
+
+    def decorator(func: Callable[[pd.DataFrame, str], object]) -> Callable[[pd.DataFrame, str], object]:
+        DERIVED_FEATURES.append((name, func))
+        return func
+
+    return decorator
+
+
+def age_group_codes(ages) -> np.ndarray:
+    """Bracket index into ``AGE_GROUP_LABELS`` for each age (missing ages fall in the last bracket, like ``categorize_age``)."""
+    return np.searchsorted(AGE_GROUP_EDGES, np.asarray(ages, dtype="float64"), side="right").astype("int8")
+
+
+@derived_feature("Height_m")
+def _height_m(df: pd.DataFrame, float_dtype: str):
+    return df["Height_in"].astype(float_dtype) * 0.0254
+
 
+@derived_feature("Weight_kg")
+def _weight_kg(df: pd.DataFrame, float_dtype: str):
+    return df["Weight_lb"].astype(float_dtype) * 0.45359237
+
+
+@derived_feature("BMI")
+def _bmi(df: pd.DataFrame, float_dtype: str):
+    return (df["Weight_kg"] / (df["Height_m"] ** 2)).round(2)
+
+
+@derived_feature("AgeGroup")
+def _age_group(df: pd.DataFrame, float_dtype: str):
+    return pd.Categorical.from_codes(age_group_codes(df["Age_yr"]), categories=AGE_GROUP_LABELS, ordered=True)
+
+
+@derived_feature("Frailty_binary")
+def _frailty_binary(df: pd.DataFrame, float_dtype: str):
+    return df["Frailty"].isin(["Y", "y"]).astype("int8")
+
+
+def _age_group_indicator(index: int) -> Callable[[pd.DataFrame, str], np.ndarray]:
+    return lambda df, float_dtype: (df["AgeGroup"].cat.codes.to_numpy() == index).view("int8")
+
+
+for _index, _label in enumerate(AGE_GROUP_LABELS):
+    derived_feature(f"AgeGroup_{_label}")(_age_group_indicator(_index))
+
+
+@instrumented("enrich_features")
+@cached_stage()
+def enrich_features(df: pd.DataFrame, float_dtype: str = FEATURE_FLOAT_DTYPE) -> pd.DataFrame:
+    """Append every registered derived feature; unit conversions and BMI use ``float_dtype``."""
+    df = df.copy()
+    for name, feature in DERIVED_FEATURES:
+        df[name] = feature(df, float_dtype)
     return df
 
 
+@instrumented("summarize")
 def summarize(df: pd.DataFrame) -> pd.DataFrame:
     numeric_cols = df.select_dtypes(include=["number"]).columns
     summary = df[numeric_cols].agg(["mean", "median", "std"]).T
     return summary.round(2)
 
 
-def update_findings(summary: pd.DataFrame, correlation: float) -> None:
+@instrumented("update_findings")
+def update_findings(summary: pd.DataFrame, grip_frailty: float, interval: Optional[Interval] = None) -> None:
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
     table_lines = ["| Column | Mean | Median | Std |", "| --- | ---: | ---: | ---: |"]
     for column, stats in summary.iterrows():
@@ -72,32 +164,272 @@ def update_findings(summary: pd.DataFrame, correlation: float) -> None:
         "",
         table_markdown,
         "",
-        f"Correlation(Grip_kg, Frailty_binary) = {correlation:.3f}"
+        f"Correlation(Grip_kg, Frailty_binary) = {grip_frailty:.3f}"
+        + (f" ({interval.describe('.3f')})" if interval is not None else "")
     ]
     section = "\n".join(section_lines).strip()
 
     existing = ""
+    current = ""
     if FINDINGS_PATH.exists():
-        existing = FINDINGS_PATH.read_text(encoding="utf-8")
+        current = FINDINGS_PATH.read_text(encoding="utf-8")
         pattern = re.compile(r"## Frailty Workflow[\s\S]*?(?=\n## |\Z)")
-        existing = pattern.sub("", existing).strip()
+        existing = pattern.sub("", current).strip()
 
     if existing:
         existing = existing.rstrip() + "\n\n"
 
-    FINDINGS_PATH.write_text(existing + section + "\n", encoding="utf-8")
+    updated = existing + section + "\n"
+    if updated != current:
+        write_text(FINDINGS_PATH, updated)
+
 
+class SummaryState:
+    """Persisted sufficient statistics behind ``summarize`` and the grip/frailty correlation."""
 
-def main() -> None:
+    def __init__(self, raw_path: Path, header: str, float_dtype: str) -> None:
+        self.raw_path = str(raw_path)
+        self.header = header
+        self.float_dtype = float_dtype
+        self.byte_offset = 0
+        # Running SHA-256 of raw[:byte_offset]; only its hex digest is persisted.
+        self.prefix = hashlib.sha256()
+        self.prefix_sha256 = ""
+        self.rows = 0
+        self.quarantined = 0
+        # Size of the processed CSV this state describes; a mismatch means an interrupted append.
+        self.processed_bytes = 0
+        self.moments: Dict[str, RunningMoments] = {}
+        self.sketches: Dict[str, QuantileSketch] = {}
+        self.grip_frailty = RunningCovariance()
+        # Distinct (Grip_kg, Frailty_binary) pairs and their frequencies: all the bootstrap needs.
+        self.grip_frailty_counts: Dict[Tuple[float, float], int] = {}
+
+    def update(self, enriched: pd.DataFrame) -> None:
+        for column in enriched.select_dtypes(include=["number"]).columns:
+            self.moments.setdefault(column, RunningMoments()).update(enriched[column])
+            self.sketches.setdefault(column, QuantileSketch(MEDIAN_RESOLUTION)).update(enriched[column])
+        self.grip_frailty.update(enriched["Grip_kg"], enriched["Frailty_binary"])
+        table, counts = compress(enriched["Grip_kg"], enriched["Frailty_binary"])
+        for pair, count in zip(map(tuple, table.tolist()), counts.tolist()):
+            self.grip_frailty_counts[pair] = self.grip_frailty_counts.get(pair, 0) + count
+        self.rows += len(enriched)
+
+    def summary(self) -> pd.DataFrame:
+        summary = pd.DataFrame(
+            {
+                "mean": [self.moments[column].mean for column in self.moments],
+                "median": [self.sketches[column].median() for column in self.moments],
+                "std": [self.moments[column].std for column in self.moments],
+            },
+            index=list(self.moments),
+        )
+        return summary.round(2)
+
+    def save(self, path: Path) -> None:
+        state = {
+            "raw_path": self.raw_path,
+            "header": self.header,
+            "float_dtype": self.float_dtype,
+            "byte_offset": self.byte_offset,
+            "prefix_sha256": self.prefix.hexdigest(),
+            "rows": self.rows,
+            "quarantined": self.quarantined,
+            "processed_bytes": self.processed_bytes,
+            "moments": {column: moments.to_state() for column, moments in self.moments.items()},
+            "sketches": {column: sketch.to_state() for column, sketch in self.sketches.items()},
+            "grip_frailty": self.grip_frailty.to_state(),
+            "grip_frailty_counts": [[*pair, count] for pair, count in sorted(self.grip_frailty_counts.items())],
+        }
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SummaryState":
+        state = json.loads(path.read_text(encoding="utf-8"))
+        loaded = cls(Path(state["raw_path"]), state["header"], state["float_dtype"])
+        loaded.byte_offset = state["byte_offset"]
+        loaded.prefix_sha256 = state["prefix_sha256"]
+        loaded.rows = state["rows"]
+        loaded.quarantined = state["quarantined"]
+        loaded.processed_bytes = state["processed_bytes"]
+        loaded.moments = {column: RunningMoments.from_state(value) for column, value in state["moments"].items()}
+        loaded.sketches = {column: QuantileSketch.from_state(value) for column, value in state["sketches"].items()}
+        loaded.grip_frailty = RunningCovariance.from_state(state["grip_frailty"])
+        loaded.grip_frailty_counts = {(grip, flag): count for grip, flag, count in state["grip_frailty_counts"]}
+        return loaded
+
+
+def _read_complete_lines(raw_path: Path, offset: int) -> Tuple[bytes, int]:
+    """Bytes from ``offset`` up to the last newline, so a half-written final row waits for the next run."""
+    with open(raw_path, "rb") as handle:
+        handle.seek(offset)
+        data = handle.read()
+    end = data.rfind(b"\n") + 1
+    return data[:end], offset + end
+
+
+def _hash_prefix(raw_path: Path, length: int):
+    """Running SHA-256 of the first ``length`` bytes of ``raw_path``."""
+    digest = hashlib.sha256()
+    with open(raw_path, "rb") as handle:
+        while length > 0:
+            block = handle.read(min(length, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            length -= len(block)
+    return digest
+
+
+def _load_state(raw_path: Path, header: str, float_dtype: str, processed_path: Path) -> Optional[SummaryState]:
+    """Reuse the persisted state only if it still describes a prefix of ``raw_path``.
+
+    The bytes already processed must hash to the persisted digest, so rows edited
+    in place (even without changing the file size) force a rebuild, and the
+    processed CSV must still have the size recorded after the last append.
+    """
+    if not (STATE_PATH.exists() and processed_path.exists()):
+        return None
+    try:
+        state = SummaryState.load(STATE_PATH)
+    except KeyError:
+        # Written before a field was added; rebuild rather than report from partial state.
+        return None
+    if (
+        state.raw_path != str(raw_path)
+        or state.header != header
+        or state.float_dtype != float_dtype
+        or raw_path.stat().st_size < state.byte_offset
+        or processed_path.stat().st_size != state.processed_bytes
+    ):
+        return None
+    prefix = _hash_prefix(raw_path, state.byte_offset)
+    if prefix.hexdigest() != state.prefix_sha256:
+        return None
+    state.prefix = prefix
+    return state
+
+
+@instrumented("incremental")
+def run_incremental(
+    raw_path: Path = RAW_PATH, float_dtype: str = FEATURE_FLOAT_DTYPE, bootstrap: Optional[Bootstrap] = None
+) -> int:
+    """Process only rows appended to ``raw_path`` since the last run and refresh the findings.
+
+    The new rows are enriched and appended to the processed CSV, and the persisted
+    sufficient statistics (moments, median sketches, grip/frailty co-moments and
+    pair counts) are updated, so runtime follows the delta rather than the full history. New rows
+    that fail ``FRAILTY_SCHEMA`` are appended to the quarantine file. Falls back to a full rebuild
+    when there is no usable state. Returns the number of new rows.
+    """
+    processed_path = artifact_path(PROCESSED_BASE, "csv")
+    with open(raw_path, "rb") as handle:
+        header_bytes = handle.readline()
+    header = header_bytes.decode("utf-8").strip()
+    columns = header.split(",")
+
+    state = _load_state(raw_path, header, float_dtype, processed_path)
+    rebuild = state is None
+    if rebuild:
+        state = SummaryState(raw_path, header, float_dtype)
+        state.byte_offset = len(header_bytes)
+        state.prefix.update(header_bytes)
+
+    data, new_offset = _read_complete_lines(raw_path, state.byte_offset)
+    state.prefix.update(data)
+    if data.strip():
+        delta = pd.read_csv(io.BytesIO(data), header=None, names=columns, dtype=FRAILTY_SCHEMA.parse_dtypes())
+    else:
+        delta = pd.DataFrame(columns=columns)
+    # Number the new rows by their position in the raw file so quarantine entries point back to it.
+    delta.index += state.rows + state.quarantined
+    checked = FRAILTY_SCHEMA.validate(delta)
+    write_quarantine(checked.quarantine, QUARANTINE_PATH, append=not rebuild)
+    state.quarantined += len(checked.quarantine)
+    if len(checked.valid) or rebuild:
+        enriched = enrich_features(checked.valid, float_dtype)
+        enriched = apply_dtypes(enriched, PROCESSED_DTYPES)
+        if rebuild:
+            write_table(_csv_spelling(enriched), PROCESSED_BASE, "csv")
+        else:
+            # Appends cannot be renamed into place; ``processed_bytes`` catches an interrupted one instead.
+            _csv_spelling(enriched).to_csv(processed_path, mode="a", header=False, index=False, encoding="utf-8")
+        state.update(enriched)
+    state.byte_offset = new_offset
+    state.processed_bytes = processed_path.stat().st_size
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    state.save(STATE_PATH)
+
+    interval = grip_frailty_interval(*table_from_counts(state.grip_frailty_counts), bootstrap)
+    update_findings(state.summary(), state.grip_frailty.correlation, interval)
+    return len(delta)
+
+
+@instrumented("grip_frailty_interval")
+def grip_frailty_interval(table: np.ndarray, counts: np.ndarray, bootstrap: Optional[Bootstrap]) -> Optional[Interval]:
+    """Bootstrap interval of Corr(Grip_kg, Frailty_binary) from the distinct pairs and their counts."""
+    if bootstrap is None or bootstrap.resamples <= 0:
+        return None
+    return bootstrap.interval_from_table(correlation, table, counts)
+
+
+def main(
+    fmt: str = ARTIFACT_FORMAT, float_dtype: str = FEATURE_FLOAT_DTYPE, bootstrap: Optional[Bootstrap] = None
+) -> None:
     raw_df = load_data()
-    enriched_df = enrich_features(raw_df)
-    PROCESSED_PATH.parent.mkdir(parents=True, exist_ok=True)
-    enriched_df.to_csv(PROCESSED_PATH, index=False, encoding="utf-8")
+    enriched_df = enrich_features(raw_df, float_dtype)
+    # Columnar formats keep the float64 dtype so every run writes the same schema.
+    write_table(_csv_spelling(enriched_df) if fmt == "csv" else enriched_df, PROCESSED_BASE, fmt, PROCESSED_DTYPES)
+    # A full rebuild supersedes any incremental state.
+    STATE_PATH.unlink(missing_ok=True)
     summary = summarize(enriched_df)
-    correlation = enriched_df["Grip_kg"].corr(enriched_df["Frailty_binary"])
-    update_findings(summary, correlation)
+    grip, frailty = enriched_df["Grip_kg"], enriched_df["Frailty_binary"]
+    interval = grip_frailty_interval(*compress(grip, frailty), bootstrap)
+    update_findings(summary, grip.corr(frailty), interval)
     print("Frailty workflow completed successfully.")
 
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--format", choices=sorted(FORMATS), default=ARTIFACT_FORMAT, help="storage format for the processed artifact")
+    parser.add_argument("--force", action="store_true", help="recompute every stage even when its cache entry is fresh")
+    parser.add_argument("--float-dtype", choices=["float64", "float32"], default=FEATURE_FLOAT_DTYPE, help="precision of unit conversions and BMI")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="process only rows appended since the last incremental run (CSV artifact only)",
+    )
+    parser.add_argument(
+        "--bootstrap-resamples",
+        type=int,
+        default=DEFAULT_RESAMPLES,
+        help="bootstrap resamples behind the correlation's confidence interval (0 = point estimate only)",
+    )
+    parser.add_argument("--bootstrap-workers", type=int, default=1, help="processes drawing bootstrap resamples")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="bootstrap seed; intervals do not depend on the worker count")
+    parser.add_argument("--profile-stage", default=None, help="profile this stage (e.g. enrich_features) and save the profile next to the manifest")
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile")
+    return parser.parse_args(argv)
+
+
+def run_cli(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    stage_cache.configure(force=args.force)
+    if args.incremental and args.format != "csv":
+        raise SystemExit("--incremental appends to the CSV artifact; drop --format or use --format csv")
+    bootstrap = Bootstrap(args.bootstrap_resamples, seed=args.seed, workers=args.bootstrap_workers)
+    with run_manifest("frailty", MANIFEST_PATH, args.profile_stage, args.profiler), bootstrap:
+        if args.incremental:
+            new_rows = run_incremental(float_dtype=args.float_dtype, bootstrap=bootstrap)
+            print(f"Frailty workflow updated incrementally with {new_rows} new rows.")
+        else:
+            main(args.format, args.float_dtype, bootstrap)
+    quarantined = count_quarantined(QUARANTINE_PATH)
+    if quarantined:
+        print(f"Quarantined {quarantined} malformed rows to {QUARANTINE_PATH}")
+
+
 if __name__ == "__main__":
-    main()
+    run_cli()
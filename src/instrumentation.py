@@ -0,0 +1,238 @@
+"""Per-stage timing and memory instrumentation with a JSON run manifest.
+
+Stages are marked with ``@instrumented("name")``. While a ``run_manifest`` is
+active, every call records wall time, CPU time, peak RSS, rows in/out and bytes
+read/written; outside a run the decorator is a no-op. Stages run in pool
+workers through ``call_recorded`` are recorded there and merged back with
+``merge_worker``, tagged with the worker's pid. One chosen stage can be
+profiled with cProfile (or pyinstrument, when installed).
+"""
+from contextlib import contextmanager
+from functools import wraps
+import json
+import os
+from pathlib import Path
+import platform
+import resource
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+def _proc_fields(path: str, fields: List[str]) -> Dict[str, int]:
+    values: Dict[str, int] = {}
+    try:
+        with open(path) as handle:
+            for line in handle:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    values[key] = int(rest.split()[0])
+    except OSError:
+        pass
+    return values
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark so it reflects only what runs next (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size (Linux ``/proc/self/status``; None elsewhere)."""
+    status = _proc_fields("/proc/self/status", ["VmRSS"])
+    return status["VmRSS"] / 1024 if "VmRSS" in status else None
+
+
+def peak_rss_mb() -> float:
+    status = _proc_fields("/proc/self/status", ["VmHWM"])
+    if "VmHWM" in status:
+        return status["VmHWM"] / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _io_bytes() -> Dict[str, int]:
+    """Bytes read/written by this process so far (Linux ``/proc/self/io``; empty elsewhere)."""
+    return _proc_fields("/proc/self/io", ["rchar", "wchar"])
+
+
+def _rows(value: Any) -> Optional[int]:
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        for item in value:
+            if isinstance(item, (pd.DataFrame, pd.Series)):
+                return len(item)
+    return None
+
+
+class RunManifest:
+    """Stage records for one run, written as JSON when the run finishes."""
+
+    def __init__(self, name: str, path: Path, profile_stage: Optional[str] = None, profiler: str = "cprofile") -> None:
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler {profiler!r}; expected one of {PROFILERS}")
+        self.name = name
+        self.path = path
+        self.profile_stage = profile_stage
+        self.profiler = profiler
+        self.stages: List[Dict[str, Any]] = []
+        self.profiles: List[str] = []
+        self._peaks: List[float] = []
+        self._started = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def record(self, stage: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+        rows_in = next((rows for rows in map(_rows, list(args) + list(kwargs.values())) if rows is not None), None)
+        io_before = _io_bytes()
+        self._peaks.append(0.0)
+        reset_peak_rss()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            result = self._profile(stage, func, args, kwargs) if stage == self.profile_stage else func(*args, **kwargs)
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            peak = max(peak_rss_mb(), self._peaks.pop())
+            if self._peaks:
+                # A nested stage reset the high-water mark; carry its peak up to the enclosing stage.
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            io_after = _io_bytes()
+        self.stages.append(
+            {
+                "stage": stage,
+                "depth": len(self._peaks),
+                "wall_s": round(wall, 6),
+                "cpu_s": round(cpu, 6),
+                "peak_rss_mb": round(peak, 2),
+                "rows_in": rows_in,
+                "rows_out": _rows(result),
+                "bytes_read": io_after["rchar"] - io_before["rchar"] if "rchar" in io_after else None,
+                "bytes_written": io_after["wchar"] - io_before["wchar"] if "wchar" in io_after else None,
+            }
+        )
+        return result
+
+    def merge(self, records: Dict[str, Any]) -> None:
+        """Add the stages a pool worker recorded with ``call_recorded``, nested under the running stage."""
+        depth = len(self._peaks)
+        self.stages.extend({**item, "depth": item["depth"] + depth} for item in records["stages"])
+        self.profiles.extend(records["profiles"])
+
+    def _profile(self, stage: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+        if self.profiler == "pyinstrument":
+            from pyinstrument import Profiler
+
+            profiler = Profiler()
+            profiler.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.stop()
+                output = self.path.with_name(f"{self.path.stem}.{stage}.html")
+                output.write_text(profiler.output_html(), encoding="utf-8")
+                self.profiles.append(str(output))
+
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            output = self.path.with_name(f"{self.path.stem}.{stage}.prof")
+            profiler.dump_stats(str(output))
+            self.profiles.append(str(output))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run": self.name,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started)),
+            "wall_s": round(time.perf_counter() - self._wall, 6),
+            "cpu_s": round(time.process_time() - self._cpu, 6),
+            "argv": sys.argv,
+            "pid": os.getpid(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stages": self.stages,
+            "profiles": self.profiles,
+        }
+
+    def write(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return self.path
+
+
+ACTIVE: List[RunManifest] = []
+
+
+@contextmanager
+def run_manifest(
+    name: str, path: Path, profile_stage: Optional[str] = None, profiler: str = "cprofile"
+) -> Iterator[RunManifest]:
+    """Record every instrumented stage called inside the block and write the manifest at exit."""
+    manifest = RunManifest(name, path, profile_stage, profiler)
+    ACTIVE.append(manifest)
+    try:
+        yield manifest
+    finally:
+        ACTIVE.remove(manifest)
+        manifest.write()
+
+
+def instrumented(stage: str) -> Callable[[Callable], Callable]:
+    """Record calls to the decorated stage in the active run manifest, if any."""
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ACTIVE:
+                return func(*args, **kwargs)
+            return ACTIVE[-1].record(stage, func, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def worker_context() -> "WorkerContext":
+    """Settings a pool worker needs to record stages for the active manifest (None outside a run)."""
+    if not ACTIVE:
+        return None
+    manifest = ACTIVE[-1]
+    return manifest.path, manifest.profile_stage, manifest.profiler
+
+
+WorkerContext = Optional[Tuple[Path, Optional[str], str]]
+
+
+def call_recorded(context: WorkerContext, func: Callable, *args, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """Run ``func`` in a pool worker, recording its stages under ``context`` (from ``worker_context``).
+
+    Returns the result and the worker's records; pass the records to ``merge_worker`` in the parent.
+    """
+    if context is None:
+        return func(*args, **kwargs), {"stages": [], "profiles": []}
+    manifest = RunManifest("worker", *context)
+    ACTIVE.append(manifest)
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        ACTIVE.remove(manifest)
+    pid = os.getpid()
+    return result, {"stages": [{**item, "pid": pid} for item in manifest.stages], "profiles": manifest.profiles}
+
+
+def merge_worker(records: Dict[str, Any]) -> None:
+    """Fold a worker's stage records into the active manifest, if any."""
+    if ACTIVE:
+        ACTIVE[-1].merge(records)
@@ -0,0 +1,181 @@
+"""Background, atomic writes for output artifacts (PNGs, CSVs, markdown).
+
+Inside ``async_writes()`` the helpers below queue each write on a thread pool
+and return immediately, so rendering and statistics continue while earlier
+artifacts are encoded and flushed. Outside it they write synchronously. Either
+way every file is written to a temporary sibling and moved into place with
+``os.replace``, so readers never see a half-written artifact. Call
+``barrier()`` (or ``wait_for``) before writing anything that refers to
+queued files, such as report links.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+import os
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+WRITER_THREADS = 4
+
+
+def temporary_path(path: Path) -> Path:
+    """A hidden sibling of ``path``, unique per process and thread, to write before renaming into place."""
+    # Keep the suffix so writers that infer the format from it (savefig, pyarrow) still work.
+    return path.with_name(f".{path.stem}.{os.getpid()}-{threading.get_ident()}.tmp{path.suffix}")
+
+
+def atomic_write(path: Path, write: Callable[[Path], None]) -> None:
+    """Call ``write(tmp)`` on a temporary sibling of ``path`` and rename it into place."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = temporary_path(path)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _raise_first(futures: Iterable[Future]) -> None:
+    errors = [future.exception() for future in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+
+
+class OutputWriter:
+    """Thread pool of atomic writes, plus a serial lane for work that depends on finished writes."""
+
+    def __init__(self, workers: int = WRITER_THREADS) -> None:
+        self.pid = os.getpid()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="output-writer")
+        # Follow-ups block on writes, so they run on their own thread and can never starve the pool.
+        self._followups = ThreadPoolExecutor(max_workers=1, thread_name_prefix="output-followup")
+        self._pending: Dict[Path, Future] = {}
+        self._followup_futures: List[Future] = []
+
+    def submit(self, path: Path, write: Callable[[Path], None]) -> Future:
+        path = Path(path)
+        previous = self._pending.get(path)
+
+        def job() -> None:
+            if previous is not None:
+                # Writes to the same path land in submission order.
+                wait([previous])
+            atomic_write(path, write)
+
+        future = self._pool.submit(job)
+        self._pending[path] = future
+        return future
+
+    def after(self, paths: Iterable[Path], callback: Callable[[], Any]) -> Future:
+        """Run ``callback`` once the queued writes of ``paths`` have finished successfully."""
+        dependencies = [self._pending[Path(path)] for path in paths if Path(path) in self._pending]
+
+        def job() -> Any:
+            wait(dependencies)
+            _raise_first(dependencies)
+            return callback()
+
+        future = self._followups.submit(job)
+        self._followup_futures.append(future)
+        return future
+
+    def wait(self, paths: Optional[Iterable[Path]] = None) -> None:
+        """Block until the queued writes of ``paths`` (all writes when None) are on disk."""
+        if paths is None:
+            futures = list(self._pending.values())
+        else:
+            futures = [self._pending[Path(path)] for path in paths if Path(path) in self._pending]
+        wait(futures)
+        _raise_first(futures)
+
+    def barrier(self) -> None:
+        """Block until every queued write and follow-up has finished, re-raising the first failure."""
+        futures = list(self._pending.values())
+        wait(futures)
+        followups = list(self._followup_futures)
+        wait(followups)
+        _raise_first(futures + followups)
+
+    def close(self) -> None:
+        try:
+            self.barrier()
+        finally:
+            self._pool.shutdown()
+            self._followups.shutdown()
+
+
+ACTIVE: List[OutputWriter] = []
+
+
+def active_writer() -> Optional[OutputWriter]:
+    """The writer of the innermost ``async_writes`` block in this process, if any.
+
+    Forked workers inherit ``ACTIVE`` but not the writer's threads, so they write synchronously.
+    """
+    if ACTIVE and ACTIVE[-1].pid == os.getpid():
+        return ACTIVE[-1]
+    return None
+
+
+@contextmanager
+def async_writes(workers: int = WRITER_THREADS) -> Iterator[OutputWriter]:
+    """Queue writes in the background for the duration of the block; the block exits after a barrier.
+
+    Nested blocks join the enclosing writer.
+    """
+    writer = active_writer()
+    if writer is not None:
+        yield writer
+        return
+    writer = OutputWriter(workers)
+    ACTIVE.append(writer)
+    try:
+        yield writer
+    finally:
+        ACTIVE.remove(writer)
+        writer.close()
+
+
+def write_output(path: Path, write: Callable[[Path], None]) -> None:
+    writer = active_writer()
+    if writer is None:
+        atomic_write(path, write)
+    else:
+        writer.submit(path, write)
+
+
+def write_text(path: Path, text: str, encoding: str = "utf-8") -> None:
+    write_output(path, lambda tmp: tmp.write_text(text, encoding=encoding))
+
+
+def write_csv(frame, path: Path, **kwargs) -> None:
+    write_output(path, lambda tmp: frame.to_csv(tmp, **kwargs))
+
+
+def save_figure(fig, path: Path, **kwargs) -> None:
+    """``fig.savefig`` in the background; the figure must not be modified afterwards."""
+    write_output(path, lambda tmp: fig.savefig(tmp, **kwargs))
+
+
+def after_writes(paths: Iterable[Path], callback: Callable[[], Any]) -> None:
+    """Run ``callback`` once the queued writes of ``paths`` are done (immediately when writes are synchronous)."""
+    writer = active_writer()
+    if writer is None:
+        callback()
+    else:
+        writer.after(paths, callback)
+
+
+def wait_for(paths: Iterable[Path]) -> None:
+    writer = active_writer()
+    if writer is not None:
+        writer.wait(paths)
+
+
+def barrier() -> None:
+    writer = active_writer()
+    if writer is not None:
+        writer.barrier()
@@ -3,68 +3,136 @@
 Stages: ingest -> process -> analyze
 """
 
+import argparse
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 
+from artifact_store import FORMATS, TableWriter, artifact_path, write_table
+from dataset import COLUMN_RENAMES, StudentsDataset, load_students
+from instrumentation import PROFILERS, instrumented, run_manifest
+from output_writer import async_writes, wait_for, write_csv, write_text
+from running_stats import IntHistogram, RunningMoments
+from schema import STUDENTS_SCHEMA, QuarantineWriter, count_quarantined, quarantine_path, write_quarantine
+from score_cube import CubeBuilder, cube_files
+from score_matrix import MatrixWriter, ScoreMatrix
+import stage_cache
+from stage_cache import cached_stage
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 RAW_DATA_PATH = PROJECT_ROOT / "data" / "raw" / "students_performance.csv"
 PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
 ANALYSIS_DIR = PROJECT_ROOT / "outputs" / "analysis"
 
-def ingest(raw_path: Path = RAW_DATA_PATH) -> pd.DataFrame:
-    """Load the raw dataset and persist an ingested copy."""
-    df = pd.read_csv(raw_path)
-    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-    ingested_path = PROCESSED_DIR / "students_performance_ingested.csv"
-    df.to_csv(ingested_path, index=False)
-    return df
-
-def process(df: pd.DataFrame) -> pd.DataFrame:
-    """Clean column names, derive helper columns, and persist the result."""
-    renamed = df.rename(
-        columns={
-            "race/ethnicity": "race_ethnicity",
-            "parental level of education": "parental_education",
-            "test preparation course": "test_preparation_course",
-            "math score": "math_score",
-            "reading score": "reading_score",
-            "writing score": "writing_score",
-        }
-    )
-    renamed.columns = [col.replace(" ", "_").lower() for col in renamed.columns]
+INGESTED_NAME = "students_performance_ingested"
+PROCESSED_NAME = "students_performance_processed"
+INGESTED_BASE = PROCESSED_DIR / INGESTED_NAME
+PROCESSED_BASE = PROCESSED_DIR / PROCESSED_NAME
+MATRIX_DIR = PROCESSED_DIR / "students_matrix"
+CUBE_DIR = PROCESSED_DIR / "students_cube"
+MANIFEST_NAME = "pipeline_manifest.json"
+ANALYSIS_FILES = ("score_summary.csv", "prep_course_performance.csv", "analysis_report.md")
+ARTIFACT_FORMAT = "csv"
+BACKENDS = ("frame", "matrix")
+
+SCORE_BANDS = pd.CategoricalDtype(["needs_support", "proficient", "advanced"], ordered=True)
+# Compact storage dtypes for the processed artifact; the ingested copy uses the raw names.
+PROCESSED_DTYPES = {
+    "gender": "category",
+    "race_ethnicity": "category",
+    "parental_education": "category",
+    "lunch": "category",
+    "test_preparation_course": "category",
+    "math_score": "int8",
+    "reading_score": "int8",
+    "writing_score": "int8",
+    "score_band": SCORE_BANDS,
+}
+RAW_DTYPES = {raw: PROCESSED_DTYPES[COLUMN_RENAMES.get(raw, raw)] for raw in ["gender", "lunch", *COLUMN_RENAMES]}
+
+CHUNK_SIZE = 250_000
+SCORE_COLUMNS = ["math_score", "reading_score", "writing_score", "average_score"]
+# Grid resolution per score column: subjects are integers, the average is a multiple of 1/3.
+SCORE_SCALES = {"math_score": 1, "reading_score": 1, "writing_score": 1, "average_score": 3}
+
+@instrumented("ingest")
+@cached_stage(
+    outputs=lambda args: [
+        artifact_path(args["processed_dir"] / INGESTED_NAME, args["fmt"]),
+        # Cached too (including its absence after a clean run), so a hit never leaves a stale file.
+        quarantine_path(args["processed_dir"], STUDENTS_SCHEMA.name),
+    ]
+)
+def ingest(raw_path: Path = RAW_DATA_PATH, fmt: str = ARTIFACT_FORMAT, processed_dir: Path = PROCESSED_DIR) -> pd.DataFrame:
+    """Load the raw dataset and persist an ingested copy.
+
+    The returned frame carries the shared ``average_score`` column from the
+    single-read loader so ``process`` does not derive it again. Rows that fail
+    the schema are written to ``students_performance_quarantine.csv`` instead.
+    """
+    dataset = load_students(raw_path)
+    write_quarantine(dataset.quarantine, quarantine_path(processed_dir, STUDENTS_SCHEMA.name))
+    write_table(dataset.frame, processed_dir / INGESTED_NAME, fmt, RAW_DTYPES)
+    return dataset.view("raw", derived=["average_score"])
+
+def ingest_chunks(
+    raw_path: Path = RAW_DATA_PATH,
+    chunksize: int = CHUNK_SIZE,
+    fmt: str = ARTIFACT_FORMAT,
+    processed_dir: Path = PROCESSED_DIR,
+) -> Iterator[pd.DataFrame]:
+    """Stream the raw dataset chunk by chunk, appending each validated chunk to the ingested copy.
 
-    numeric_cols = ["math_score", "reading_score", "writing_score"]
-    renamed["average_score"] = renamed[numeric_cols].mean(axis=1)
+    Rejected rows are appended to the quarantine file chunk by chunk as well.
+    """
+    with TableWriter(processed_dir / INGESTED_NAME, fmt, RAW_DTYPES) as writer, QuarantineWriter(
+        quarantine_path(processed_dir, STUDENTS_SCHEMA.name)
+    ) as quarantine, pd.read_csv(raw_path, chunksize=chunksize, dtype=STUDENTS_SCHEMA.parse_dtypes()) as reader:
+        for chunk in reader:
+            checked = STUDENTS_SCHEMA.validate(chunk)
+            quarantine.write(checked.quarantine)
+            writer.write(checked.valid)
+            yield checked.valid
+
+def derive_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """The snake_case view of a raw-named frame plus the derived helper columns, without persisting anything."""
+    # Frames from ``ingest`` already carry the shared average; chunks and synthetic frames derive it here.
+    derived = [] if "average_score" in df else ["average_score"]
+    renamed = StudentsDataset(df).view("snake", derived=derived)
     renamed["score_band"] = pd.cut(
         renamed["average_score"],
         bins=[0, 60, 80, 100],
         labels=["needs_support", "proficient", "advanced"],
         include_lowest=True,
     )
-
-    processed_path = PROCESSED_DIR / "students_performance_processed.csv"
-    renamed.to_csv(processed_path, index=False)
     return renamed
 
-def analyze(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """Generate aggregate views and persist analysis artifacts."""
-    ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
-
-    score_summary = df[["math_score", "reading_score", "writing_score", "average_score"]].agg(
-        ["mean", "median", "std"]
-    ).round(2)
-    summary_path = ANALYSIS_DIR / "score_summary.csv"
-    score_summary.to_csv(summary_path)
+@instrumented("process")
+@cached_stage(
+    outputs=lambda args: [
+        artifact_path(args["processed_dir"] / PROCESSED_NAME, args["fmt"]),
+        *cube_files(args["processed_dir"] / CUBE_DIR.name),
+    ]
+)
+def process(df: pd.DataFrame, fmt: str = ARTIFACT_FORMAT, processed_dir: Path = PROCESSED_DIR) -> pd.DataFrame:
+    """Clean column names, derive helper columns, and persist the result plus its score cube."""
+    renamed = derive_columns(df)
+    write_table(renamed, processed_dir / PROCESSED_NAME, fmt, PROCESSED_DTYPES)
+    cube = CubeBuilder()
+    cube.update(renamed)
+    cube.save(processed_dir / CUBE_DIR.name)
+    return renamed
 
-    prep_course = (
-        df.groupby("test_preparation_course")["average_score"].agg(["mean", "median", "count"])
-        .sort_values("mean", ascending=False)
-        .round(2)
-    )
-    prep_path = ANALYSIS_DIR / "prep_course_performance.csv"
-    prep_course.to_csv(prep_path)
+def write_analysis(
+    score_summary: pd.DataFrame, prep_course: pd.DataFrame, top_band_share: float, analysis_dir: Path = ANALYSIS_DIR
+) -> None:
+    """Persist the aggregate tables and the markdown report."""
+    analysis_dir.mkdir(parents=True, exist_ok=True)
+    summary_path = analysis_dir / "score_summary.csv"
+    write_csv(score_summary, summary_path)
+    prep_path = analysis_dir / "prep_course_performance.csv"
+    write_csv(prep_course, prep_path)
 
     report_lines = [
         "# StudentsPerformance Analysis",
@@ -77,7 +145,6 @@ def analyze(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
         "",
         "### Key observations",
     ]
-    top_band_share = (df["score_band"] == "advanced").mean() * 100
     prep_gain = prep_course.loc["completed", "mean"] - prep_course.loc["none", "mean"] if {"completed", "none"}.issubset(prep_course.index) else float("nan")
     report_lines.append(f"- Advanced score band represents {top_band_share:.1f}% of students.")
     if not pd.isna(prep_gain):
@@ -85,16 +152,176 @@ def analyze(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
             f"- Completing the test preparation course increases average scores by {prep_gain:.1f} points over students without it."
         )
 
-    report_path = ANALYSIS_DIR / "analysis_report.md"
-    report_path.write_text("\n".join(report_lines))
+    # The report points at both tables, so it lands only after they do.
+    wait_for([summary_path, prep_path])
+    write_text(analysis_dir / "analysis_report.md", "\n".join(report_lines))
 
+@instrumented("analyze")
+@cached_stage(outputs=lambda args: [args["analysis_dir"] / name for name in ANALYSIS_FILES])
+def analyze(df: pd.DataFrame, analysis_dir: Path = ANALYSIS_DIR) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Generate aggregate views and persist analysis artifacts (tables written in the background)."""
+    with async_writes():
+        score_summary = df[SCORE_COLUMNS].agg(["mean", "median", "std"]).round(2)
+        prep_course = (
+            df.groupby("test_preparation_course")["average_score"].agg(["mean", "median", "count"])
+            .sort_values("mean", ascending=False)
+            .round(2)
+        )
+        top_band_share = (df["score_band"] == "advanced").mean() * 100
+        write_analysis(score_summary, prep_course, top_band_share, analysis_dir)
     return score_summary, prep_course
 
-def run_pipeline() -> None:
-    """Execute pipeline stages end-to-end."""
-    raw_df = ingest()
-    processed_df = process(raw_df)
-    analyze(processed_df)
+class StreamingAnalysis:
+    """Mergeable running aggregates that reproduce ``analyze`` one chunk at a time."""
+
+    def __init__(self) -> None:
+        self.moments = {col: RunningMoments() for col in SCORE_COLUMNS}
+        self.histograms = {col: IntHistogram(scale=SCORE_SCALES[col]) for col in SCORE_COLUMNS}
+        self.prep_moments: Dict[str, RunningMoments] = {}
+        self.prep_histograms: Dict[str, IntHistogram] = {}
+        self.rows = 0
+        self.advanced = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        for col in SCORE_COLUMNS:
+            self.moments[col].update(chunk[col])
+            self.histograms[col].update(chunk[col])
+        for group, values in chunk.groupby("test_preparation_course")["average_score"]:
+            self.prep_moments.setdefault(group, RunningMoments()).update(values)
+            self.prep_histograms.setdefault(group, IntHistogram(scale=3)).update(values)
+        self.rows += len(chunk)
+        self.advanced += int((chunk["score_band"] == "advanced").sum())
+
+    def score_summary(self) -> pd.DataFrame:
+        summary = pd.DataFrame(
+            {
+                col: [self.moments[col].mean, self.histograms[col].median(), self.moments[col].std]
+                for col in SCORE_COLUMNS
+            },
+            index=["mean", "median", "std"],
+        )
+        return summary.round(2)
+
+    def prep_course(self) -> pd.DataFrame:
+        groups = sorted(self.prep_moments)
+        prep_course = pd.DataFrame(
+            {
+                "mean": [self.prep_moments[g].mean for g in groups],
+                "median": [self.prep_histograms[g].median() for g in groups],
+                "count": [self.prep_moments[g].count for g in groups],
+            },
+            index=pd.Index(groups, name="test_preparation_course"),
+        )
+        return prep_course.sort_values("mean", ascending=False).round(2)
+
+    def top_band_share(self) -> float:
+        return self.advanced / self.rows * 100 if self.rows else float("nan")
+
+@instrumented("streaming")
+def run_streaming(
+    raw_path: Path = RAW_DATA_PATH,
+    chunksize: int = CHUNK_SIZE,
+    fmt: str = ARTIFACT_FORMAT,
+    processed_dir: Path = PROCESSED_DIR,
+    analysis_dir: Path = ANALYSIS_DIR,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Run ingest -> process -> analyze chunk by chunk with flat peak memory."""
+    stats = StreamingAnalysis()
+    cube = CubeBuilder()
+    with TableWriter(processed_dir / PROCESSED_NAME, fmt, PROCESSED_DTYPES) as writer:
+        for chunk in ingest_chunks(raw_path, chunksize, fmt, processed_dir):
+            processed = derive_columns(chunk)
+            writer.write(processed)
+            stats.update(processed)
+            cube.update(processed)
+    cube.save(processed_dir / CUBE_DIR.name)
+
+    score_summary = stats.score_summary()
+    prep_course = stats.prep_course()
+    write_analysis(score_summary, prep_course, stats.top_band_share(), analysis_dir)
+    return score_summary, prep_course
+
+@instrumented("analyze_matrix")
+def analyze_matrix(matrix: ScoreMatrix, analysis_dir: Path = ANALYSIS_DIR) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """``analyze`` computed chunk by chunk on a memory-mapped score matrix, plus the V4/V5 statistics."""
+    score_summary = matrix.summary().round(2)
+    prep_course = (
+        matrix.grouped("test_preparation_course")[["mean", "median", "count"]]
+        .sort_values("mean", ascending=False)
+        .round(2)
+    )
+    # score_band "advanced" is an average in (80, 100].
+    write_analysis(score_summary, prep_course, matrix.share_above(80) * 100, analysis_dir)
+    # The V4 correlation matrix and V5 math-on-reading fits, reduced from the same buffers.
+    write_csv(matrix.correlation().round(3), analysis_dir / "subject_correlation.csv")
+    trend = matrix.regression("test_preparation_course", "reading_score", "math_score")
+    write_csv(trend.round(3), analysis_dir / "prep_course_trend.csv")
+    return score_summary, prep_course
+
+@instrumented("matrix")
+def run_matrix(
+    raw_path: Path = RAW_DATA_PATH,
+    chunksize: int = CHUNK_SIZE,
+    fmt: str = ARTIFACT_FORMAT,
+    processed_dir: Path = PROCESSED_DIR,
+    analysis_dir: Path = ANALYSIS_DIR,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Stream ingest -> process into the processed artifact, score cube and score matrix, then analyze the matrix."""
+    matrix_dir = processed_dir / MATRIX_DIR.name
+    cube = CubeBuilder()
+    with TableWriter(processed_dir / PROCESSED_NAME, fmt, PROCESSED_DTYPES) as writer, MatrixWriter(matrix_dir) as matrix:
+        for chunk in ingest_chunks(raw_path, chunksize, fmt, processed_dir):
+            processed = derive_columns(chunk)
+            writer.write(processed)
+            matrix.write(processed)
+            cube.update(processed)
+    cube.save(processed_dir / CUBE_DIR.name)
+    return analyze_matrix(ScoreMatrix(matrix_dir), analysis_dir)
+
+def run_pipeline(
+    raw_path: Path = RAW_DATA_PATH,
+    streaming: bool = False,
+    chunksize: int = CHUNK_SIZE,
+    fmt: str = ARTIFACT_FORMAT,
+    processed_dir: Path = PROCESSED_DIR,
+    analysis_dir: Path = ANALYSIS_DIR,
+    backend: str = "frame",
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Execute pipeline stages end-to-end and return the score summary and prep-course tables."""
+    if backend == "matrix":
+        return run_matrix(raw_path, chunksize, fmt, processed_dir, analysis_dir)
+    if streaming:
+        return run_streaming(raw_path, chunksize, fmt, processed_dir, analysis_dir)
+    raw_df = ingest(raw_path, fmt, processed_dir)
+    processed_df = process(raw_df, fmt, processed_dir)
+    return analyze(processed_df, analysis_dir)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stream", action="store_true", help="process the raw file chunk by chunk")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="rows per chunk in streaming mode")
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="frame",
+        help="'matrix' streams the scores into a memory-mapped uint8 matrix and analyzes it in chunks",
+    )
+    parser.add_argument("--format", choices=sorted(FORMATS), default=ARTIFACT_FORMAT, help="storage format for data/processed artifacts")
+    parser.add_argument("--force", action="store_true", help="recompute every stage even when its cache entry is fresh")
+    parser.add_argument("--profile-stage", default=None, help="profile this stage (e.g. process) and save the profile next to the manifest")
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile")
+    return parser.parse_args(argv)
+
+def run_cli(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    stage_cache.configure(force=args.force)
+    with run_manifest("pipeline", ANALYSIS_DIR / MANIFEST_NAME, args.profile_stage, args.profiler) as manifest:
+        run_pipeline(streaming=args.stream, chunksize=args.chunksize, fmt=args.format, backend=args.backend)
+    quarantine = quarantine_path(PROCESSED_DIR, STUDENTS_SCHEMA.name)
+    quarantined = count_quarantined(quarantine)
+    if quarantined:
+        print(f"Quarantined {quarantined} malformed rows to {quarantine}")
+    print(f"Pipeline completed; run manifest saved to {manifest.path}")
 
 if __name__ == "__main__":
-    run_pipeline()
+    run_cli()
@@ -0,0 +1,215 @@
+"""Mergeable running aggregates for chunked / streaming statistics.
+
+Every accumulator can be updated with a chunk of values and merged with another
+accumulator of the same kind, so partial results from chunks (or workers)
+combine into exactly the statistics of the concatenated data.
+"""
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+@dataclass
+class RunningMoments:
+    """Count / mean / variance via Welford's algorithm with Chan's merge rule."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        chunk_mean = values.mean()
+        chunk = RunningMoments(int(values.size), float(chunk_mean), float(((values - chunk_mean) ** 2).sum()))
+        self.merge(chunk)
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta**2 * self.count * other.count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else float("nan")
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    def to_state(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "RunningMoments":
+        return cls(**state)
+
+
+@dataclass
+class RunningCovariance:
+    """Pairwise count / means / co-moments for a Pearson correlation, mergeable like ``RunningMoments``.
+
+    Rows where either value is missing are skipped, matching ``Series.corr``.
+    """
+
+    count: int = 0
+    mean_x: float = 0.0
+    mean_y: float = 0.0
+    m2_x: float = 0.0
+    m2_y: float = 0.0
+    c_xy: float = 0.0
+
+    def update(self, x, y) -> None:
+        x = np.asarray(x, dtype="float64")
+        y = np.asarray(y, dtype="float64")
+        keep = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[keep], y[keep]
+        if x.size == 0:
+            return
+        dx, dy = x - x.mean(), y - y.mean()
+        self.merge(
+            RunningCovariance(
+                int(x.size), float(x.mean()), float(y.mean()), float(dx @ dx), float(dy @ dy), float(dx @ dy)
+            )
+        )
+
+    def merge(self, other: "RunningCovariance") -> None:
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        weight = self.count * other.count / total
+        self.m2_x += other.m2_x + delta_x**2 * weight
+        self.m2_y += other.m2_y + delta_y**2 * weight
+        self.c_xy += other.c_xy + delta_x * delta_y * weight
+        self.mean_x += delta_x * other.count / total
+        self.mean_y += delta_y * other.count / total
+        self.count = total
+
+    @property
+    def correlation(self) -> float:
+        denominator = np.sqrt(self.m2_x * self.m2_y)
+        return float(self.c_xy / denominator) if self.count > 1 and denominator > 0 else float("nan")
+
+    def fit(self) -> Tuple[float, float]:
+        """Least-squares ``(slope, intercept)`` of y on x (NaN below two points or for constant x)."""
+        if self.count < 2 or self.m2_x == 0:
+            return float("nan"), float("nan")
+        slope = self.c_xy / self.m2_x
+        return float(slope), float(self.mean_y - slope * self.mean_x)
+
+    def to_state(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "RunningCovariance":
+        return cls(**state)
+
+
+def histogram_medians(counts: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """Median of each row of ``counts``, the frequencies of the sorted values ``grid``.
+
+    pandas semantics: the mean of the two middle values for even counts, NaN for
+    an empty row. A 1-d ``counts`` is treated as a single row.
+    """
+    counts = np.atleast_2d(counts)
+    cumulative = np.cumsum(counts, axis=-1)
+    n = cumulative[:, -1]
+    # The value of 0-based rank r sits in the first bin whose cumulative count exceeds r.
+    last = counts.shape[-1] - 1
+    upper = np.minimum((cumulative <= (n // 2)[:, None]).sum(axis=1), last)
+    lower = np.minimum((cumulative <= ((n - 1) // 2)[:, None]).sum(axis=1), last)
+    return np.where(n > 0, (grid[lower] + grid[upper]) / 2, np.nan)
+
+
+@dataclass
+class IntHistogram:
+    """Exact histogram for bounded values on a fixed grid of ``1 / scale``.
+
+    Scores are integers in ``[low, high]`` so ``scale=1`` is exact for them; the
+    three-subject average is a multiple of 1/3, hence ``scale=3``.
+    """
+
+    low: int = 0
+    high: int = 100
+    scale: int = 1
+    counts: np.ndarray = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.counts is None:
+            self.counts = np.zeros((self.high - self.low) * self.scale + 1, dtype="int64")
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        keys = np.rint((values - self.low) * self.scale).astype("int64")
+        if keys.size and (keys.min() < 0 or keys.max() >= self.counts.size):
+            raise ValueError(f"values outside histogram range [{self.low}, {self.high}]")
+        self.counts += np.bincount(keys, minlength=self.counts.size)
+
+    def merge(self, other: "IntHistogram") -> None:
+        self.counts += other.counts
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def median(self) -> float:
+        """Median with pandas semantics (mean of the two middle values for even counts)."""
+        grid = self.low + np.arange(self.counts.size) / self.scale
+        return float(histogram_medians(self.counts, grid)[0])
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch that counts values snapped to a grid of ``resolution``.
+
+    Quantiles are exact up to ``resolution / 2`` and memory grows with the number
+    of distinct grid cells, not with the number of values, which suits bounded
+    physical measurements.
+    """
+
+    def __init__(self, resolution: float = 1e-4, counts: Dict[int, int] = None) -> None:
+        self.resolution = resolution
+        self.counts: Dict[int, int] = dict(counts or {})
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        keys, counts = np.unique(np.rint(values / self.resolution).astype("int64"), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.counts[key] = self.counts.get(key, 0) + count
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.resolution != self.resolution:
+            raise ValueError("cannot merge sketches with different resolutions")
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    def median(self) -> float:
+        """Median with pandas semantics (mean of the two middle values for even counts)."""
+        n = self.count
+        if n == 0:
+            return float("nan")
+        keys = sorted(self.counts)
+        counts = np.array([self.counts[key] for key in keys], dtype="int64")
+        return float(histogram_medians(counts, np.array(keys, dtype="int64") * self.resolution)[0])
+
+    def to_state(self) -> Dict:
+        keys = sorted(self.counts)
+        return {"resolution": self.resolution, "keys": keys, "counts": [self.counts[key] for key in keys]}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "QuantileSketch":
+        return cls(state["resolution"], dict(zip(state["keys"], state["counts"])))
@@ -0,0 +1,236 @@
+"""Declarative schemas for the raw datasets, validated with vectorized masks.
+
+Each ``Schema`` lists its columns with a kind (``int``, ``float`` or
+``category``), an optional range or set of allowed labels, and the compact
+dtype the column is stored in. ``Schema.read_csv`` parses labels straight into
+categoricals. Numbers parse as native int64/float64, because ``read_csv`` with
+``dtype="int8"`` silently wraps out-of-range values (300 becomes 44). Every
+rule is then one boolean mask over the whole column: missing value,
+non-numeric value, fractional value in an integer column, out of range, or
+unknown label. Rows that fail any rule move to a quarantine frame with a
+``reasons`` column. The remaining rows are narrowed to their compact dtypes.
+Enum checks only look at a categorical's distinct labels and range checks are
+single comparisons, so validation adds little on top of parsing.
+"""
+from dataclasses import dataclass
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from output_writer import temporary_path, write_csv
+
+QUARANTINE_SUFFIX = "_quarantine.csv"
+
+
+@dataclass(frozen=True)
+class Column:
+    """One raw column: its kind, allowed values and storage dtype."""
+
+    name: str
+    kind: str
+    dtype: str
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    choices: Tuple[str, ...] = ()
+
+
+@dataclass
+class ValidationResult:
+    """Rows that passed (compact dtypes, fresh RangeIndex) and rows that did not (raw values plus ``reasons``)."""
+
+    valid: pd.DataFrame
+    quarantine: pd.DataFrame
+
+
+def _drop_unused(values: pd.Series) -> pd.Series:
+    """``cat.remove_unused_categories`` via a bincount of the codes instead of a sort."""
+    codes = values.cat.codes.to_numpy()
+    used = np.bincount(codes[codes >= 0], minlength=len(values.cat.categories)) > 0
+    return values if used.all() else values.cat.remove_categories(values.cat.categories[~used])
+
+
+@dataclass(frozen=True)
+class Schema:
+    """Column rules for one dataset."""
+
+    name: str
+    columns: Tuple[Column, ...]
+
+    @property
+    def names(self) -> List[str]:
+        return [column.name for column in self.columns]
+
+    def parse_dtypes(self) -> Dict[str, str]:
+        """``read_csv`` dtypes: labels parse straight into categoricals, numbers are inferred."""
+        return {column.name: "category" for column in self.columns if column.kind == "category"}
+
+    def read_csv(self, source, **kwargs) -> ValidationResult:
+        return self.validate(pd.read_csv(source, dtype=self.parse_dtypes(), **kwargs))
+
+    def validate(self, frame: pd.DataFrame) -> ValidationResult:
+        """Split ``frame`` into valid rows and quarantined rows with their reasons."""
+        absent = [name for name in self.names if name not in frame.columns]
+        if absent:
+            raise ValueError(f"{self.name}: missing columns {absent}")
+        checks: List[Tuple[str, np.ndarray]] = []
+        parsed: Dict[str, pd.Series] = {}
+        for column in self.columns:
+            values = frame[column.name]
+            if column.kind == "category":
+                if not isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.astype("category")
+                    frame = frame.assign(**{column.name: values})
+                codes = values.cat.codes.to_numpy()
+                checks.append((f"{column.name}: missing", codes < 0))
+                if column.choices:
+                    # Check each distinct label once, then broadcast through the codes.
+                    allowed = np.append(values.cat.categories.isin(column.choices), True)
+                    checks.append((f"{column.name}: unknown label", ~allowed[codes]))
+                continue
+            if isinstance(values.dtype, np.dtype) and values.dtype.kind in "iu":
+                # Clean integer column: nothing can be missing, unparsed or fractional.
+                numbers, numeric = values, values.to_numpy()
+            else:
+                missing = values.isna().to_numpy()
+                checks.append((f"{column.name}: missing", missing))
+                numbers = values if pd.api.types.is_numeric_dtype(values) else pd.to_numeric(values, errors="coerce")
+                numeric = numbers.to_numpy(dtype="float64", na_value=np.nan)
+                checks.append((f"{column.name}: not a number", np.isnan(numeric) & ~missing))
+                if column.kind == "int":
+                    checks.append((f"{column.name}: not an integer", ~np.isnan(numeric) & (numeric % 1 != 0)))
+            if column.minimum is not None or column.maximum is not None:
+                low = -np.inf if column.minimum is None else column.minimum
+                high = np.inf if column.maximum is None else column.maximum
+                checks.append((f"{column.name}: outside [{low:g}, {high:g}]", (numeric < low) | (numeric > high)))
+            parsed[column.name] = numbers
+
+        bad = np.zeros(len(frame), dtype=bool)
+        for _, mask in checks:
+            bad |= mask
+        clean = not bad.any()
+        kept = frame if clean else frame.loc[~bad]
+        narrowed = {}
+        for column in self.columns:
+            if column.kind == "category":
+                narrowed[column.name] = kept[column.name] if clean else _drop_unused(kept[column.name])
+            else:
+                numbers = parsed[column.name]
+                narrowed[column.name] = (numbers if clean else numbers[~bad]).astype(column.dtype)
+        valid = kept.assign(**narrowed).reset_index(drop=True)
+
+        quarantine = frame.loc[bad]
+        reasons = pd.Series("", index=quarantine.index, dtype=object)
+        for reason, mask in checks:
+            hit = mask[bad]
+            if hit.any():
+                reasons[hit] = reasons[hit] + "; " + reason
+        quarantine = quarantine.assign(reasons=reasons.str[2:])
+        return ValidationResult(valid, quarantine)
+
+
+def quarantine_path(directory: Path, name: str) -> Path:
+    return directory / f"{name}{QUARANTINE_SUFFIX}"
+
+
+def write_quarantine(rows: pd.DataFrame, path: Path, append: bool = False) -> int:
+    """Persist quarantined rows, indexed by their data row number in the source, and return how many.
+
+    A clean full run removes a stale file; ``append`` adds to it instead (incremental runs).
+    """
+    if rows.empty:
+        if not append:
+            path.unlink(missing_ok=True)
+        return 0
+    if append:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rows.to_csv(path, mode="a", header=not path.exists(), index_label="row")
+    else:
+        write_csv(rows, path, index_label="row")
+    return len(rows)
+
+
+def count_quarantined(path: Path) -> int:
+    """Rows in the quarantine file ``path`` (0 when there is none), for the CLIs to report."""
+    if not path.exists():
+        return 0
+    return len(pd.read_csv(path, usecols=["row"]))
+
+
+class QuarantineWriter:
+    """Append quarantined rows chunk by chunk (streaming ingest), so memory does not grow with bad rows.
+
+    Rows go to a temporary sibling that ``close`` renames into place; a run
+    without bad rows removes any stale file instead.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.rows = 0
+        self._tmp = temporary_path(path)
+
+    def write(self, rows: pd.DataFrame) -> None:
+        if rows.empty:
+            return
+        if self.rows == 0:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        rows.to_csv(self._tmp, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index_label="row")
+        self.rows += len(rows)
+
+    def close(self, commit: bool = True) -> int:
+        """Commit (or discard) the rows written so far and return how many were committed."""
+        if not commit:
+            self._tmp.unlink(missing_ok=True)
+            return 0
+        if self.rows:
+            os.replace(self._tmp, self.path)
+        else:
+            self.path.unlink(missing_ok=True)
+        return self.rows
+
+    def __enter__(self) -> "QuarantineWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(commit=exc_type is None)
+
+
+STUDENTS_SCHEMA = Schema(
+    "students_performance",
+    (
+        Column("gender", "category", "category", choices=("female", "male")),
+        Column("race/ethnicity", "category", "category", choices=tuple(f"group {letter}" for letter in "ABCDE")),
+        Column(
+            "parental level of education",
+            "category",
+            "category",
+            choices=(
+                "some high school",
+                "high school",
+                "some college",
+                "associate's degree",
+                "bachelor's degree",
+                "master's degree",
+            ),
+        ),
+        Column("lunch", "category", "category", choices=("standard", "free/reduced")),
+        Column("test preparation course", "category", "category", choices=("none", "completed")),
+        Column("math score", "int", "int8", 0, 100),
+        Column("reading score", "int", "int8", 0, 100),
+        Column("writing score", "int", "int8", 0, 100),
+    ),
+)
+
+FRAILTY_SCHEMA = Schema(
+    "frailty_data",
+    (
+        Column("Height_in", "float", "float64", 36, 96),
+        # Measurements may be fractional (150.4 lb, 27.5 kg); only ages are whole numbers by definition.
+        Column("Weight_lb", "float", "float64", 50, 700),
+        Column("Age_yr", "int", "int8", 0, 120),
+        Column("Grip_kg", "float", "float64", 0, 150),
+        Column("Frailty", "category", "category", choices=("Y", "N", "y", "n")),
+    ),
+)
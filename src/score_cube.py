@@ -0,0 +1,246 @@
+"""Pre-aggregated score cube over the categorical student attributes.
+
+``process`` builds the cube once. Every combination of gender, race/ethnicity,
+parental education, lunch and test preparation is one cell. Each cell holds the
+row count, the integer sum of each score, and an exact histogram per score:
+the subjects on their 0..100 grid, the three-subject average on the 0..300
+row-sum grid. These are all mergeable, so a roll-up over
+any dimensions is a sum over array axes and a slice is an index. Means follow
+from the sums, standard deviations from mean-centred squares over the histogram
+grid (exact sums of squares overflow int64 at archive scale), and exact medians
+(pandas semantics) from the histograms. A drill-down such as gender x lunch x
+race_ethnicity therefore never rescans the row-level data: ``aggregate`` answers
+it in a fraction of a millisecond, and ``rollup`` wraps the answer in a
+DataFrame in a few milliseconds.
+
+On disk the cube is ``cube.npz`` (compressed, each array in the smallest integer
+dtype that holds it) plus ``cube.json`` with the dimension labels and
+``FORMAT_VERSION``; a cube in another format must be rebuilt. The JSON is
+written last and acts as the commit marker, as for the score matrix. Rows with a
+missing attribute are left out of the cube and counted in ``excluded_rows``.
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from dataset import COLUMN_RENAMES
+from output_writer import atomic_write
+from running_stats import histogram_medians
+from score_matrix import ATTRIBUTES, ROW_SUM_MAX, SCORE_MAX, SCORES
+
+DIMENSIONS = ATTRIBUTES
+CUBE_SCORES = [*SCORES, "average_score"]
+# Histogram grid per score: subjects are integers, the average is a row sum / 3.
+SCALES = {**{name: 1 for name in SCORES}, "average_score": 3}
+BINS = {**{name: SCORE_MAX + 1 for name in SCORES}, "average_score": ROW_SUM_MAX + 1}
+ARRAYS_FILE = "cube.npz"
+META_FILE = "cube.json"
+# Version 2 dropped the per-cell sums of squares.
+FORMAT_VERSION = 2
+QUERY_COLUMNS = ["count", "mean", "std", "median"]
+
+Selection = Union[str, Sequence[str]]
+
+
+def cube_files(directory: Path) -> List[Path]:
+    return [directory / ARRAYS_FILE, directory / META_FILE]
+
+
+def _compact(array: np.ndarray) -> np.ndarray:
+    """``array`` (non-negative integers) in the smallest unsigned dtype that holds its maximum."""
+    return array.astype(np.min_scalar_type(int(array.max())) if array.size else "uint8")
+
+
+class CubeBuilder:
+    """Accumulate processed (or raw-named) chunks into cube cells; labels are added as they appear."""
+
+    def __init__(self) -> None:
+        self.labels: Dict[str, List[str]] = {name: [] for name in DIMENSIONS}
+        self.counts = np.zeros((0,) * len(DIMENSIONS), dtype="int64")
+        self.histograms = {name: np.zeros(self.counts.shape + (BINS[name],), dtype="int64") for name in CUBE_SCORES}
+        self.excluded_rows = 0
+
+    def _encode(self, name: str, values: pd.Series) -> np.ndarray:
+        codes, uniques = pd.factorize(values)
+        labels = self.labels[name]
+        mapping = []
+        for label in map(str, uniques):
+            if label not in labels:
+                labels.append(label)
+            mapping.append(labels.index(label))
+        return np.array(mapping + [-1], dtype="int64")[codes]
+
+    def _grow(self) -> None:
+        shape = tuple(len(self.labels[name]) for name in DIMENSIONS)
+        if shape == self.counts.shape:
+            return
+        padding = [(0, new - old) for new, old in zip(shape, self.counts.shape)]
+        self.counts = np.pad(self.counts, padding)
+        self.histograms = {name: np.pad(hist, padding + [(0, 0)]) for name, hist in self.histograms.items()}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        chunk = chunk.rename(columns=COLUMN_RENAMES)
+        codes = [self._encode(name, chunk[name]) for name in DIMENSIONS]
+        scores = chunk[SCORES].to_numpy(dtype="float64")
+        present = scores[~np.isnan(scores)]
+        if (present < 0).any() or (present > SCORE_MAX).any() or (present % 1).any():
+            raise ValueError(f"score cube needs integer scores in 0..{SCORE_MAX}")
+        keep = np.all([code >= 0 for code in codes], axis=0) & ~np.isnan(scores).any(axis=1)
+        self.excluded_rows += int((~keep).sum())
+        self._grow()
+        cells = np.ravel_multi_index([code[keep] for code in codes], self.counts.shape)
+        size = self.counts.size
+        self.counts += np.bincount(cells, minlength=size).reshape(self.counts.shape)
+        values = scores[keep].astype("int64")
+        columns = {name: values[:, index] for index, name in enumerate(SCORES)}
+        columns["average_score"] = values.sum(axis=1)
+        for name, column in columns.items():
+            keys = cells * BINS[name] + column
+            self.histograms[name] += np.bincount(keys, minlength=size * BINS[name]).reshape(self.histograms[name].shape)
+
+    def save(self, directory: Path) -> None:
+        """Write the cube with labels in sorted order (matching ``groupby``)."""
+        order = [np.argsort(self.labels[name], kind="stable") for name in DIMENSIONS]
+        index = np.ix_(*order)
+        counts = self.counts[index]
+        arrays = {"counts": _compact(counts)}
+        for name in CUBE_SCORES:
+            hist = self.histograms[name][index]
+            grid = np.arange(BINS[name], dtype="int64")
+            arrays[f"hist_{name}"] = _compact(hist)
+            arrays[f"sum_{name}"] = _compact(hist @ grid)
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "dimensions": DIMENSIONS,
+            "labels": {name: sorted(self.labels[name]) for name in DIMENSIONS},
+            "scores": CUBE_SCORES,
+            "rows": int(counts.sum()),
+            "excluded_rows": self.excluded_rows,
+        }
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / META_FILE).unlink(missing_ok=True)
+        atomic_write(directory / ARRAYS_FILE, lambda tmp: np.savez_compressed(tmp, **arrays))
+        atomic_write(directory / META_FILE, lambda tmp: tmp.write_text(json.dumps(meta, indent=2), encoding="utf-8"))
+
+
+def build_cube(df: pd.DataFrame, directory: Path) -> "ScoreCube":
+    """Aggregate ``df`` into a cube in ``directory`` and open it."""
+    builder = CubeBuilder()
+    builder.update(df)
+    builder.save(directory)
+    return ScoreCube.load(directory)
+
+
+class ScoreCube:
+    """Read-only cube; ``slice`` narrows labels, ``rollup`` aggregates to any subset of dimensions."""
+
+    def __init__(self, labels: Dict[str, List[str]], arrays: Dict[str, np.ndarray], excluded_rows: int = 0) -> None:
+        self.labels = labels
+        self.arrays = arrays
+        self.excluded_rows = excluded_rows
+
+    @classmethod
+    def load(cls, directory: Path) -> "ScoreCube":
+        meta = json.loads((directory / META_FILE).read_text(encoding="utf-8"))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"{directory} holds a version {meta.get('format_version', 1)} score cube; "
+                f"rebuild it (version {FORMAT_VERSION}) by re-running the pipeline"
+            )
+        with np.load(directory / ARRAYS_FILE) as stored:
+            arrays = {name: stored[name].astype("int64") for name in stored.files}
+        return cls(meta["labels"], arrays, meta["excluded_rows"])
+
+    @property
+    def rows(self) -> int:
+        return int(self.arrays["counts"].sum())
+
+    def slice(self, **where: Selection) -> "ScoreCube":
+        """Sub-cube keeping only the given label(s) per dimension, e.g. ``slice(lunch="standard")``."""
+        unknown = set(where) - set(DIMENSIONS)
+        if unknown:
+            raise KeyError(f"unknown cube dimensions {sorted(unknown)}; expected some of {DIMENSIONS}")
+        positions = []
+        labels = {}
+        for name in DIMENSIONS:
+            selected = where.get(name, self.labels[name])
+            selected = [selected] if isinstance(selected, str) else list(selected)
+            missing = [label for label in selected if label not in self.labels[name]]
+            if missing:
+                raise KeyError(f"{name} has no label(s) {missing}")
+            positions.append([self.labels[name].index(label) for label in selected])
+            labels[name] = selected
+        index = np.ix_(*positions)
+        return ScoreCube(labels, {key: array[index] for key, array in self.arrays.items()}, self.excluded_rows)
+
+    def aggregate(self, by: Sequence[str] = (), score: str = "average_score") -> Dict[str, np.ndarray]:
+        """count / mean / std / median arrays of ``score`` over the label product of ``by``.
+
+        Groups come in ``itertools.product`` order of the labels (empty ones as
+        count 0 and NaN). This is the raw query path: a few small array
+        reductions, without building a DataFrame.
+        """
+        if score not in SCALES:
+            raise KeyError(f"unknown score {score!r}; expected one of {CUBE_SCORES}")
+        unknown = set(by) - set(DIMENSIONS)
+        if unknown:
+            raise KeyError(f"unknown cube dimensions {sorted(unknown)}; expected some of {DIMENSIONS}")
+        axes = tuple(DIMENSIONS.index(name) for name in DIMENSIONS if name not in by)
+        # Summing leaves the kept dimensions in cube order; move them into the order of ``by``.
+        kept = sorted(DIMENSIONS.index(name) for name in by)
+        order = [kept.index(DIMENSIONS.index(name)) for name in by]
+
+        def collapse(array: np.ndarray) -> np.ndarray:
+            reduced = array.sum(axis=axes)
+            reduced = reduced.transpose(order + list(range(len(by), reduced.ndim)))
+            return reduced.reshape(-1, *reduced.shape[len(by):])
+
+        n = collapse(self.arrays["counts"])
+        total = collapse(self.arrays[f"sum_{score}"])
+        hist = collapse(self.arrays[f"hist_{score}"])
+        scale = SCALES[score]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / (scale * n)
+            # Mean-centred squares over the histogram grid in float64: ``n * sum_sq - sum**2``
+            # overflows int64 once a group holds ~1e8 rows and cancels badly in float64.
+            grid = np.arange(hist.shape[-1]) / scale
+            deviations = grid - mean[:, None]
+            variance = (hist * deviations**2).sum(axis=1) / (n - 1)
+        return {
+            "count": n,
+            "mean": mean,
+            "std": np.sqrt(np.where(n > 1, variance, np.nan)),
+            "median": histogram_medians(hist, grid),
+        }
+
+    def rollup(self, by: Sequence[str] = (), score: str = "average_score") -> pd.DataFrame:
+        """``aggregate`` as a frame indexed by the labels of ``by``, empty groups dropped as in ``groupby``.
+
+        With no ``by`` the result is a single ``"all"`` row.
+        """
+        by = list(by)
+        stats = self.aggregate(by, score)
+        if len(by) > 1:
+            index = pd.MultiIndex.from_product([self.labels[name] for name in by], names=by)
+        elif by:
+            index = pd.Index(self.labels[by[0]], name=by[0])
+        else:
+            index = pd.Index(["all"])
+        result = pd.DataFrame(stats, index=index, columns=QUERY_COLUMNS)
+        return result[result["count"] > 0]
+
+    def summary(self) -> pd.DataFrame:
+        """mean / median / std of every score over the whole cube, shaped like ``analyze``'s score summary."""
+        return pd.DataFrame(
+            {score: self.rollup(score=score).loc["all", ["mean", "median", "std"]] for score in CUBE_SCORES}
+        )
+
+
+def open_cube(directory: Path) -> Optional[ScoreCube]:
+    """The cube stored in ``directory``, or None when none has been completely written."""
+    if not (directory / META_FILE).exists():
+        return None
+    return ScoreCube.load(directory)
@@ -0,0 +1,218 @@
+"""Memory-mapped score matrix backend for large-scale statistics.
+
+The three subject scores are stored as one row-major ``uint8`` N x 3 matrix and
+each categorical attribute as an ``int8`` code array (``-1`` for missing), next
+to a small JSON file holding the row count and the label dictionaries. Files are
+opened read-only with ``np.memmap``, so several worker processes analysing the
+same matrix share one copy of the pages in the OS cache. Every statistic is
+reduced chunk by chunk straight from the mapped buffers with exact integer sums
+and histograms, so memory stays bounded by ``chunk_rows`` whatever N is.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from dataset import COLUMN_RENAMES
+from running_stats import IntHistogram
+
+SCORES = ["math_score", "reading_score", "writing_score"]
+ATTRIBUTES = ["gender", "race_ethnicity", "parental_education", "lunch", "test_preparation_course"]
+SCORES_FILE = "scores.u8"
+META_FILE = "matrix.json"
+CHUNK_ROWS = 4_000_000
+# Scores are 0-100, so a row sum lies in 0..300 and the average is row_sum / 3.
+SCORE_MAX = 100
+ROW_SUM_MAX = 3 * SCORE_MAX
+MAX_LABELS = np.iinfo("int8").max
+
+
+def _codes_file(name: str) -> str:
+    return f"codes_{name}.i8"
+
+
+class MatrixWriter:
+    """Append processed (or raw-named) chunks to an on-disk score matrix."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.rows = 0
+        self.labels: Dict[str, List[str]] = {name: [] for name in ATTRIBUTES}
+        self._handles: Dict[str, object] = {}
+
+    def __enter__(self) -> "MatrixWriter":
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / META_FILE).unlink(missing_ok=True)
+        self._handles = {SCORES_FILE: open(self.directory / SCORES_FILE, "wb")}
+        for name in ATTRIBUTES:
+            self._handles[name] = open(self.directory / _codes_file(name), "wb")
+        return self
+
+    def _encode(self, name: str, values: pd.Series) -> np.ndarray:
+        codes, uniques = pd.factorize(values)
+        labels = self.labels[name]
+        mapping = []
+        for label in map(str, uniques):
+            if label not in labels:
+                if len(labels) == MAX_LABELS:
+                    raise ValueError(f"{name} has more than {MAX_LABELS} distinct labels")
+                labels.append(label)
+            mapping.append(labels.index(label))
+        mapping = np.array(mapping + [-1], dtype="int8")
+        return mapping[codes]  # code -1 picks the trailing -1 sentinel
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        chunk = chunk.rename(columns=COLUMN_RENAMES)
+        scores = chunk[SCORES].to_numpy(dtype="float64")
+        if np.isnan(scores).any() or (scores < 0).any() or (scores > SCORE_MAX).any() or (scores % 1).any():
+            raise ValueError(f"score matrix needs complete integer scores in 0..{SCORE_MAX}")
+        scores.astype("uint8").tofile(self._handles[SCORES_FILE])
+        for name in ATTRIBUTES:
+            self._encode(name, chunk[name]).tofile(self._handles[name])
+        self.rows += len(chunk)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        for handle in self._handles.values():
+            handle.close()
+        if exc_type is None:
+            # The metadata file is the commit marker: a matrix without it is never opened.
+            staging = self.directory / f"{META_FILE}.tmp"
+            staging.write_text(json.dumps({"rows": self.rows, "scores": SCORES, "labels": self.labels}), encoding="utf-8")
+            os.replace(staging, self.directory / META_FILE)
+
+
+class ScoreMatrix:
+    """Read-only view over a matrix written by ``MatrixWriter``."""
+
+    def __init__(self, directory: Path, chunk_rows: int = CHUNK_ROWS) -> None:
+        meta = json.loads((directory / META_FILE).read_text(encoding="utf-8"))
+        self.directory = directory
+        self.rows: int = meta["rows"]
+        self.labels: Dict[str, List[str]] = meta["labels"]
+        self.chunk_rows = chunk_rows
+        self.scores = self._map(SCORES_FILE, "uint8", (self.rows, len(SCORES)))
+        self.codes = {name: self._map(_codes_file(name), "int8", (self.rows,)) for name in ATTRIBUTES}
+
+    def _map(self, filename: str, dtype: str, shape: tuple) -> np.ndarray:
+        if self.rows == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self.directory / filename, dtype=dtype, mode="r", shape=shape)
+
+    def chunks(self) -> Iterator[slice]:
+        for start in range(0, self.rows, self.chunk_rows):
+            yield slice(start, min(start + self.chunk_rows, self.rows))
+
+    def _label_order(self, key: str) -> List[int]:
+        """Codes of ``key`` in sorted label order, matching ``groupby``."""
+        labels = self.labels[key]
+        return sorted(range(len(labels)), key=labels.__getitem__)
+
+    def summary(self) -> pd.DataFrame:
+        """mean / median / std of each subject and of the three-subject average (pandas semantics)."""
+        histograms = np.zeros((len(SCORES), SCORE_MAX + 1), dtype="int64")
+        row_sums = np.zeros(ROW_SUM_MAX + 1, dtype="int64")
+        for rows in self.chunks():
+            block = self.scores[rows]
+            for column in range(len(SCORES)):
+                histograms[column] += np.bincount(block[:, column], minlength=SCORE_MAX + 1)
+            row_sums += np.bincount(block.sum(axis=1, dtype="int16"), minlength=ROW_SUM_MAX + 1)
+        # Every moment follows exactly from the integer histograms.
+        values = np.arange(SCORE_MAX + 1, dtype="int64")
+        sums, squares = histograms @ values, histograms @ values**2
+        totals = np.arange(ROW_SUM_MAX + 1, dtype="int64")
+        stats = {
+            name: _describe(int(sums[i]), int(squares[i]), IntHistogram(counts=histograms[i]), self.rows, 1)
+            for i, name in enumerate(SCORES)
+        }
+        stats["average_score"] = _describe(
+            int(row_sums @ totals), int(row_sums @ totals**2), IntHistogram(scale=3, counts=row_sums), self.rows, 3
+        )
+        return pd.DataFrame(stats, index=["mean", "median", "std"])
+
+    def correlation(self) -> pd.DataFrame:
+        """Pearson correlation of the subject scores."""
+        cross = np.zeros((len(SCORES), len(SCORES)))
+        sums = np.zeros(len(SCORES))
+        for rows in self.chunks():
+            # float64 holds these integer sums exactly up to 2**53.
+            block = self.scores[rows].astype("float64")
+            cross += block.T @ block
+            sums += block.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = sums / self.rows
+            covariance = cross - self.rows * np.outer(mean, mean)
+            scale = np.sqrt(np.diag(covariance))
+            corr = covariance / np.outer(scale, scale)
+        return pd.DataFrame(corr, index=SCORES, columns=SCORES)
+
+    def grouped(self, key: str) -> pd.DataFrame:
+        """count / mean / median of the three-subject average per label of ``key``."""
+        groups = len(self.labels[key])
+        histograms = np.zeros(groups * (ROW_SUM_MAX + 1), dtype="int64")
+        for rows in self.chunks():
+            codes = self.codes[key][rows]
+            valid = codes >= 0
+            keys = codes[valid].astype("int64") * (ROW_SUM_MAX + 1) + self.scores[rows][valid].sum(axis=1, dtype="int64")
+            histograms += np.bincount(keys, minlength=histograms.size)
+        histograms = histograms.reshape(groups, ROW_SUM_MAX + 1)
+        totals = np.arange(ROW_SUM_MAX + 1, dtype="int64")
+        order = self._label_order(key)
+        counts = histograms.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = histograms @ totals / (3 * counts)
+        return pd.DataFrame(
+            {
+                "count": counts[order],
+                "mean": means[order],
+                "median": [IntHistogram(scale=3, counts=histograms[code]).median() for code in order],
+            },
+            index=pd.Index([self.labels[key][code] for code in order], name=key),
+        )
+
+    def regression(self, key: str, x: str, y: str) -> pd.DataFrame:
+        """Per-group least-squares fit ``y = slope * x + intercept`` from streamed sufficient statistics."""
+        groups = len(self.labels[key])
+        xi, yi = SCORES.index(x), SCORES.index(y)
+        n, sx, sy, sxx, sxy = (np.zeros(groups, dtype="int64") for _ in range(5))
+        for rows in self.chunks():
+            codes = self.codes[key][rows]
+            valid = codes >= 0
+            codes = codes[valid]
+            block = self.scores[rows][valid]
+            xs, ys = block[:, xi].astype("int64"), block[:, yi].astype("int64")
+            n += np.bincount(codes, minlength=groups)
+            for total, weights in ((sx, xs), (sy, ys), (sxx, xs * xs), (sxy, xs * ys)):
+                total += np.bincount(codes, weights=weights, minlength=groups).astype("int64")
+        order = self._label_order(key)
+        fits = [_fit(int(n[g]), int(sx[g]), int(sy[g]), int(sxx[g]), int(sxy[g])) for g in order]
+        return pd.DataFrame(
+            {"slope": [fit[0] for fit in fits], "intercept": [fit[1] for fit in fits], "n": n[order]},
+            index=pd.Index([self.labels[key][code] for code in order], name=key),
+        )
+
+    def share_above(self, average: float) -> float:
+        """Fraction of rows whose three-subject average exceeds ``average``."""
+        if self.rows == 0:
+            return float("nan")
+        above = sum(int((self.scores[rows].sum(axis=1, dtype="int16") > 3 * average).sum()) for rows in self.chunks())
+        return above / self.rows
+
+
+def _describe(total: int, squares: int, histogram: IntHistogram, n: int, scale: int) -> List[float]:
+    """mean / median / sample std of values ``v / scale`` given the integer sums of ``v`` and ``v**2``."""
+    if n == 0:
+        return [float("nan")] * 3
+    variance = (n * squares - total * total) / (scale * scale * n * (n - 1)) if n > 1 else float("nan")
+    return [total / (scale * n), histogram.median(), float(np.sqrt(variance))]
+
+
+def _fit(n: int, sx: int, sy: int, sxx: int, sxy: int) -> tuple:
+    spread = n * sxx - sx * sx
+    if n < 2 or spread == 0:
+        return float("nan"), float("nan")
+    slope = (n * sxy - sx * sy) / spread
+    return slope, (sy - slope * sx) / n
+
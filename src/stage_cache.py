@@ -0,0 +1,209 @@
+"""Content-addressed memoization for pipeline stages.
+
+A stage's cache key hashes the contents of its inputs (files behind ``Path``
+arguments, the values of DataFrame/Series arguments), its remaining parameters,
+and the source of every module under ``src/``. Stages call into shared modules
+(``dataset``, ``schema``, ``score_cube``, ...), so an edit to any of them must
+invalidate their entries. On a hit the pickled return value is loaded and the
+stage's output files are restored from the store instead of being recomputed.
+Entries are evicted least-recently-used once the store grows past ``max_bytes``.
+"""
+from functools import lru_cache, wraps
+import hashlib
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+import pickle
+import shutil
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from output_writer import after_writes, atomic_write, wait_for
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SOURCE_DIR = PROJECT_ROOT / "src"
+CACHE_DIR = PROJECT_ROOT / ".cache" / "stages"
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+# Bump to invalidate every entry, e.g. after a dependency upgrade that changes outputs.
+CACHE_VERSION = "1"
+
+SETTINGS: Dict[str, Any] = {
+    "enabled": os.environ.get("STAGE_CACHE", "1") != "0",
+    "force": False,
+    "cache_dir": CACHE_DIR,
+    "max_bytes": MAX_CACHE_BYTES,
+}
+
+
+def configure(
+    force: Optional[bool] = None,
+    enabled: Optional[bool] = None,
+    cache_dir: Optional[Path] = None,
+    max_bytes: Optional[int] = None,
+) -> None:
+    """Adjust cache behaviour; ``force`` recomputes every stage and refreshes its entry."""
+    updates = {"force": force, "enabled": enabled, "cache_dir": cache_dir, "max_bytes": max_bytes}
+    SETTINGS.update({name: value for name, value in updates.items() if value is not None})
+
+
+@lru_cache(maxsize=None)
+def _file_digest(path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _code_digest(source_dir: Path = SOURCE_DIR) -> str:
+    """Hash of every project source file, read once per process."""
+    digest = hashlib.sha256()
+    for path in sorted(source_dir.rglob("*.py")):
+        digest.update(str(path.relative_to(source_dir)).encode())
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def fingerprint(value: Any, digest) -> None:
+    """Feed a stable content representation of ``value`` into ``digest``.
+
+    Objects can opt in by defining ``__fingerprint__(digest)``.
+    """
+    if hasattr(value, "__fingerprint__"):
+        value.__fingerprint__(digest)
+    elif isinstance(value, Path):
+        digest.update(str(value).encode())
+        if value.is_file():
+            stat = value.stat()
+            digest.update(_file_digest(str(value), stat.st_size, stat.st_mtime_ns).encode())
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(repr(value.dtypes if isinstance(value, pd.DataFrame) else value.dtype).encode())
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr(list(value.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            digest.update(repr(key).encode())
+            fingerprint(value[key], digest)
+    elif isinstance(value, (list, tuple)):
+        digest.update(type(value).__name__.encode())
+        for item in value:
+            fingerprint(item, digest)
+    else:
+        digest.update(repr(value).encode())
+
+
+def _entry_size(entry: Path) -> int:
+    return sum(path.stat().st_size for path in entry.rglob("*") if path.is_file())
+
+
+def evict(cache_dir: Path, max_bytes: int) -> None:
+    """Drop least-recently-used entries until the store fits in ``max_bytes``."""
+    if not cache_dir.exists():
+        return
+    entries = [entry for entry in cache_dir.iterdir() if (entry / "manifest.json").exists()]
+    entries.sort(key=lambda entry: (entry / "manifest.json").stat().st_mtime)
+    sizes = {entry: _entry_size(entry) for entry in entries}
+    total = sum(sizes.values())
+    for entry in entries:
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= sizes[entry]
+
+
+def _store(entry: Path, stage: str, payload: bytes, output_paths: List[Path]) -> None:
+    """Write a finished stage's pickled value and output files as cache entry ``entry``.
+
+    An entry larger than the whole store would be evicted straight away, so it is not written at all.
+    """
+    size = len(payload) + sum(path.stat().st_size for path in output_paths if path.exists())
+    if size > SETTINGS["max_bytes"]:
+        logger.debug("not caching %s: entry of %d bytes exceeds max_bytes=%d", stage, size, SETTINGS["max_bytes"])
+        return
+    staging = entry.with_name(f"{entry.name}.tmp{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    (staging / "outputs").mkdir(parents=True)
+    (staging / "value.pkl").write_bytes(payload)
+    absent = []
+    for index, path in enumerate(output_paths):
+        if path.exists():
+            shutil.copyfile(path, staging / "outputs" / f"{index}_{path.name}")
+        else:
+            absent.append(index)
+    manifest = {
+        "stage": stage,
+        "outputs": [str(path) for path in output_paths],
+        "absent": absent,
+        "created": time.time(),
+    }
+    (staging / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(staging, entry)
+    evict(Path(SETTINGS["cache_dir"]), SETTINGS["max_bytes"])
+
+
+def cached_stage(outputs: Optional[Callable[[Dict[str, Any]], Iterable[Path]]] = None):
+    """Memoize a stage function on its input contents, parameters, and code version.
+
+    ``outputs`` receives the bound arguments (defaults applied) and returns the
+    files the stage writes, so they can be restored on a cache hit. An output
+    the stage did not produce (or removed) is removed again on a hit. When the
+    stage queued those writes on an ``output_writer``, the entry is stored once
+    they have landed.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not SETTINGS["enabled"]:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            output_paths = [Path(path) for path in outputs(bound.arguments)] if outputs else []
+
+            digest = hashlib.sha256()
+            digest.update(f"{CACHE_VERSION}:{func.__module__}.{func.__qualname__}".encode())
+            digest.update(_code_digest().encode())
+            fingerprint(dict(bound.arguments), digest)
+            fingerprint([str(path) for path in output_paths], digest)
+            entry = Path(SETTINGS["cache_dir"]) / digest.hexdigest()
+            manifest_path = entry / "manifest.json"
+
+            if not SETTINGS["force"] and manifest_path.exists():
+                try:
+                    with open(entry / "value.pkl", "rb") as handle:
+                        value = pickle.load(handle)
+                    absent = set(json.loads(manifest_path.read_text(encoding="utf-8"))["absent"])
+                    wait_for(output_paths)
+                    for index, path in enumerate(output_paths):
+                        if index in absent:
+                            path.unlink(missing_ok=True)
+                            continue
+                        # Restore atomically so a reader never sees a half-copied artifact.
+                        stored = entry / "outputs" / f"{index}_{path.name}"
+                        atomic_write(path, lambda tmp, stored=stored: shutil.copyfile(stored, tmp))
+                    os.utime(manifest_path)
+                    return value
+                except (OSError, KeyError, ValueError, pickle.UnpicklingError, EOFError):
+                    shutil.rmtree(entry, ignore_errors=True)
+
+            value = func(*args, **kwargs)
+            # Pickle now: the caller may go on to use (and change) the value while writes are pending.
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            stage = f"{func.__module__}.{func.__qualname__}"
+            after_writes(output_paths, lambda: _store(entry, stage, payload, output_paths))
+            return value
+
+        return wrapper
+
+    return decorator
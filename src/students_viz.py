@@ -1,25 +1,54 @@
 """Generate visualizations for the Students Performance dataset."""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
 from pathlib import Path
 import re
-from typing import Dict
+from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+
+# Headless rendering only: pick Agg up front so matplotlib never probes for a GUI backend.
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from artifact_store import FORMATS, read_table
+from bootstrap import DEFAULT_RESAMPLES, DEFAULT_SEED, Bootstrap, Interval, compress, iqr_difference, mean_difference, slope
+from dataset import RAW_PATH, load_students
+from grouped_stats import GroupedStats, grouped_stats
+from instrumentation import PROFILERS, call_recorded, instrumented, merge_worker, run_manifest, worker_context
+from output_writer import async_writes, barrier, save_figure, write_text
+from pipeline import COLUMN_RENAMES, PROCESSED_BASE, PROCESSED_DTYPES
+from running_stats import RunningCovariance
+import stage_cache
+from stage_cache import cached_stage
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
-RAW_PATH = PROJECT_ROOT / "data" / "raw" / "students_performance.csv"
 OUTPUT_DIR = PROJECT_ROOT / "outputs" / "analysis"
 REPORTS_DIR = PROJECT_ROOT / "reports"
 REPORT_PATH = REPORTS_DIR / "analysis_report.md"
-
-FIGURES = {
-    "v1": OUTPUT_DIR / "v1_gender_boxplots.png",
-    "v2": OUTPUT_DIR / "v2_testprep_math.png",
-    "v3": OUTPUT_DIR / "v3_lunch_avg.png",
-    "v4": OUTPUT_DIR / "v4_subject_corr.png",
-    "v5": OUTPUT_DIR / "v5_scatter_trend_testprep.png",
+MANIFEST_NAME = "students_viz_manifest.json"
+
+FIGURE_NAMES = {
+    "v1": "v1_gender_boxplots.png",
+    "v2": "v2_testprep_math.png",
+    "v3": "v3_lunch_avg.png",
+    "v4": "v4_subject_corr.png",
+    "v5": "v5_scatter_trend_testprep.png",
 }
+FIGURES = {name: OUTPUT_DIR / filename for name, filename in FIGURE_NAMES.items()}
+
+GROUP_KEYS = ["gender", "test preparation course", "lunch"]
+SUBJECTS = ["math score", "reading score", "writing score"]
+TREND_GROUPS = ["completed", "none"]
+
+# From this many rows on, figures switch to aggregated rendering whose cost does not grow with N:
+# boxplots drawn from precomputed statistics, the scatter as a density grid, trends from running sums.
+LARGE_DATA_ROWS = 100_000
+# One density cell per integer score.
+DENSITY_BINS = 101
+SCORE_EXTENT = (-0.5, 100.5)
+FIT_CHUNK_ROWS = 1_000_000
 
 REQUIRED_COLUMNS = [
     "math score",
@@ -31,50 +60,220 @@ REQUIRED_COLUMNS = [
 ]
 
 
-def ingest_and_process() -> pd.DataFrame:
-    df = pd.read_csv(RAW_PATH)
-    df = df.dropna(subset=REQUIRED_COLUMNS).copy()
-    df["overall_avg"] = (df[["math score", "reading score", "writing score"]].mean(axis=1)).round(2)
+def load_processed(fmt: str, processed_base: Path = PROCESSED_BASE) -> pd.DataFrame:
+    """Read only the columns the figures need from the pipeline's processed artifact."""
+    columns = [COLUMN_RENAMES.get(col, col) for col in REQUIRED_COLUMNS] + ["average_score"]
+    df = read_table(processed_base, fmt, columns=columns, dtypes=PROCESSED_DTYPES)
+    return df.rename(columns={processed: raw for raw, processed in COLUMN_RENAMES.items()})
+
+
+@instrumented("ingest_and_process")
+def ingest_and_process(
+    fmt: Optional[str] = None, raw_path: Path = RAW_PATH, processed_base: Path = PROCESSED_BASE
+) -> pd.DataFrame:
+    """Load the cohort from the shared raw-CSV loader, or from the processed artifact when ``fmt`` is given."""
+    if fmt is None:
+        return load_students(raw_path).view("raw", derived=["overall_avg"]).dropna(subset=REQUIRED_COLUMNS)
+    df = load_processed(fmt, processed_base).dropna(subset=REQUIRED_COLUMNS)
+    df["overall_avg"] = df.pop("average_score").round(2)
     return df
 
 
-def ensure_output_dirs() -> None:
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+def group_engine(df: pd.DataFrame, stats: Optional[Dict[str, GroupedStats]], key: str) -> GroupedStats:
+    """Reuse the shared engine for ``key`` when the caller built one, else factorize on the spot."""
+    if stats is not None and key in stats:
+        return stats[key]
+    return GroupedStats(df, key)
+
+
+def ensure_output_dirs(output_dir: Path = OUTPUT_DIR) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+
+def new_figure():
+    """A 300-dpi Agg ``Figure``; matplotlib is only imported once a figure is actually rendered."""
+    from matplotlib.figure import Figure
+
+    return Figure(figsize=(8, 6), dpi=300)
+
+
+def box_stats(values: np.ndarray, label: str, whis: float = 1.5) -> Dict[str, object]:
+    """``Axes.bxp`` statistics matching ``Axes.boxplot``, with each distinct flier value kept once."""
+    values = np.asarray(values, dtype="float64")
+    if values.size == 0:
+        return {"label": label, "med": np.nan, "q1": np.nan, "q3": np.nan, "whislo": np.nan, "whishi": np.nan, "fliers": []}
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - whis * iqr) & (values <= q3 + whis * iqr)]
+    whislo = min(inside.min(), q1) if inside.size else q1
+    whishi = max(inside.max(), q3) if inside.size else q3
+    fliers = np.unique(values[(values < whislo) | (values > whishi)])
+    return {"label": label, "med": med, "q1": q1, "q3": q3, "whislo": whislo, "whishi": whishi, "fliers": fliers}
+
+
+def draw_boxplots(ax, data: List[np.ndarray], labels: List[str], large: bool) -> None:
+    """Boxplots from the raw arrays, or from precomputed statistics in large-data mode."""
+    if large:
+        ax.bxp([box_stats(values, label) for values, label in zip(data, labels)], patch_artist=True)
+    else:
+        ax.boxplot(data, tick_labels=labels, patch_artist=True)
+
+
+def streaming_fit(x: np.ndarray, y: np.ndarray, chunk_rows: int = FIT_CHUNK_ROWS) -> Dict[str, float]:
+    """Least-squares trend of y on x from chunked running sufficient statistics."""
+    covariance = RunningCovariance()
+    for start in range(0, len(x), chunk_rows):
+        covariance.update(x[start:start + chunk_rows], y[start:start + chunk_rows])
+    slope, intercept = covariance.fit()
+    return {"slope": slope, "intercept": intercept}
+
 
+def density_layer(ax, x: np.ndarray, y: np.ndarray, color: str, label: str):
+    """Draw points as a log-scaled density grid tinted with ``color`` and return a legend handle."""
+    from matplotlib.colors import LinearSegmentedColormap, to_rgb
+    from matplotlib.patches import Patch
 
-def v1_gender_boxplots(df: pd.DataFrame) -> None:
-    genders = sorted(df["gender"].str.title().unique())
+    counts, _, _ = np.histogram2d(y, x, bins=DENSITY_BINS, range=[SCORE_EXTENT, SCORE_EXTENT])
+    rgb = to_rgb(color)
+    cmap = LinearSegmentedColormap.from_list(f"density_{label}", [(*rgb, 0.0), (*rgb, 0.85)])
+    ax.imshow(
+        np.log1p(counts), origin="lower", extent=(*SCORE_EXTENT, *SCORE_EXTENT), cmap=cmap, aspect="auto", interpolation="nearest"
+    )
+    return Patch(color=color, alpha=0.6, label=label)
+
+
+def lunch_means(df: pd.DataFrame, stats: Optional[Dict[str, GroupedStats]] = None) -> pd.Series:
+    """Mean overall average per lunch type (V3)."""
+    means = group_engine(df, stats, "lunch").describe("overall_avg")["mean"].rename("overall_avg")
+    return means.reindex(["standard", "free/reduced"])
+
+
+def subject_correlation(df: pd.DataFrame) -> pd.DataFrame:
+    """Pearson correlation among the three subjects (V4)."""
+    return df[SUBJECTS].corr()
+
+
+def trend_statistics(
+    df: pd.DataFrame, stats: Optional[Dict[str, GroupedStats]] = None, large_rows: int = LARGE_DATA_ROWS
+) -> Dict[str, Dict[str, float]]:
+    """Math-on-reading fit per test-preparation group (V5); NaN below two students."""
+    engine = group_engine(df, stats, "test preparation course")
+    large = len(df) >= large_rows
+    reading, math = engine.split("reading score"), engine.split("math score")
+    fits = None if large else engine.regression("reading score", "math score")
+    trend: Dict[str, Dict[str, float]] = {}
+    for group in TREND_GROUPS:
+        x, y = reading.get(group, np.array([])), math.get(group, np.array([]))
+        if len(x) < 2:
+            trend[group] = {"slope": np.nan, "intercept": np.nan, "n": len(x)}
+            continue
+        fit = streaming_fit(x, y) if large else fits.loc[group]
+        trend[group] = {"slope": fit["slope"], "intercept": fit["intercept"], "n": len(x)}
+    return trend
+
+
+def summary_artifacts(
+    df: pd.DataFrame, stats: Optional[Dict[str, GroupedStats]] = None, large_rows: int = LARGE_DATA_ROWS
+) -> Dict[str, object]:
+    """The statistics the narrative needs from V3-V5, computed without rendering anything."""
+    return {
+        "lunch_means": lunch_means(df, stats),
+        "corr": subject_correlation(df),
+        "trend_stats": trend_statistics(df, stats, large_rows),
+    }
+
+
+def two_group_table(df: pd.DataFrame, key: str, positive: str, negative: str, value: str):
+    """``compress``ed ``[key == positive, value]`` rows of the two groups, for two-group statistics."""
+    rows = df[df[key].isin([positive, negative])]
+    return compress((rows[key] == positive).to_numpy(), rows[value].to_numpy())
+
+
+@instrumented("bootstrap_intervals")
+@cached_stage()
+def narrative_intervals(df: pd.DataFrame, bootstrap: Bootstrap) -> Dict[str, Interval]:
+    """Bootstrap intervals for the narrative's headline estimates.
+
+    ``math_iqr_gap`` is male minus female, ``prep_math_gain`` completed minus none,
+    ``lunch_gap`` standard minus free/reduced; slopes resample within their group.
+    """
+    intervals = {
+        "math_iqr_gap": bootstrap.interval_from_table(
+            iqr_difference, *two_group_table(df, "gender", "male", "female", "math score")
+        ),
+        "prep_math_gain": bootstrap.interval_from_table(
+            mean_difference, *two_group_table(df, "test preparation course", "completed", "none", "math score")
+        ),
+        "lunch_gap": bootstrap.interval_from_table(
+            mean_difference, *two_group_table(df, "lunch", "standard", "free/reduced", "overall_avg")
+        ),
+    }
+    for group in TREND_GROUPS:
+        rows = df[df["test preparation course"] == group]
+        intervals[f"slope_{group}"] = bootstrap.interval(slope, rows["reading score"], rows["math score"])
+    return intervals
+
+
+@instrumented("v1_gender_boxplots")
+@cached_stage(outputs=lambda args: [args["output_dir"] / FIGURE_NAMES["v1"]])
+def v1_gender_boxplots(
+    df: pd.DataFrame,
+    stats: Optional[Dict[str, GroupedStats]] = None,
+    output_dir: Path = OUTPUT_DIR,
+    large_rows: int = LARGE_DATA_ROWS,
+) -> None:
+    engine = group_engine(df, stats, "gender")
+    genders = sorted({str(label).title() for label in engine.labels})
     subject_map = {"Math Score": "math score", "Reading Score": "reading score"}
-    fig, axes = plt.subplots(1, 2, figsize=(8, 6), dpi=300, sharey=True)
+    fig = new_figure()
+    axes = fig.subplots(1, 2, sharey=True)
     for ax, (label, column) in zip(axes, subject_map.items()):
-        data = [df.loc[df["gender"].str.title() == gender, column] for gender in genders]
-        ax.boxplot(data, tick_labels=genders, patch_artist=True)
+        values = engine.split(column)
+        data = [
+            np.concatenate([values[raw] for raw in engine.labels if str(raw).title() == gender])
+            for gender in genders
+        ]
+        draw_boxplots(ax, data, genders, len(df) >= large_rows)
         ax.set_title(f"{label} by Gender")
         ax.set_xlabel("Gender")
         ax.set_ylabel("Score (0-100)")
     fig.suptitle("Math and Reading Scores Grouped by Gender")
     fig.tight_layout()
-    fig.savefig(FIGURES["v1"], bbox_inches="tight")
-    plt.close(fig)
+    save_figure(fig, output_dir / FIGURE_NAMES["v1"], bbox_inches="tight")
 
 
-def v2_testprep_math(df: pd.DataFrame) -> None:
+@instrumented("v2_testprep_math")
+@cached_stage(outputs=lambda args: [args["output_dir"] / FIGURE_NAMES["v2"]])
+def v2_testprep_math(
+    df: pd.DataFrame,
+    stats: Optional[Dict[str, GroupedStats]] = None,
+    output_dir: Path = OUTPUT_DIR,
+    large_rows: int = LARGE_DATA_ROWS,
+) -> None:
     order = ["completed", "none"]
-    fig, ax = plt.subplots(figsize=(8, 6), dpi=300)
-    data = [df.loc[df["test preparation course"] == grp, "math score"] for grp in order]
-    ax.boxplot(data, tick_labels=[grp.title() for grp in order], patch_artist=True)
+    fig = new_figure()
+    ax = fig.subplots()
+    values = group_engine(df, stats, "test preparation course").split("math score")
+    data = [values.get(grp, np.array([])) for grp in order]
+    draw_boxplots(ax, data, [grp.title() for grp in order], len(df) >= large_rows)
     ax.set_title("Math Score Distribution by Test Preparation Completion")
     ax.set_xlabel("Test Preparation Course")
     ax.set_ylabel("Math Score (0-100)")
     fig.tight_layout()
-    fig.savefig(FIGURES["v2"], bbox_inches="tight")
-    plt.close(fig)
-
-
-def v3_lunch_average(df: pd.DataFrame) -> pd.Series:
-    means = df.groupby("lunch")["overall_avg"].mean().reindex(["standard", "free/reduced"])
-    fig, ax = plt.subplots(figsize=(8, 6), dpi=300)
+    save_figure(fig, output_dir / FIGURE_NAMES["v2"], bbox_inches="tight")
+
+
+@instrumented("v3_lunch_average")
+@cached_stage(outputs=lambda args: [args["output_dir"] / FIGURE_NAMES["v3"]])
+def v3_lunch_average(
+    df: pd.DataFrame,
+    stats: Optional[Dict[str, GroupedStats]] = None,
+    output_dir: Path = OUTPUT_DIR,
+    large_rows: int = LARGE_DATA_ROWS,
+) -> pd.Series:
+    means = lunch_means(df, stats)
+    fig = new_figure()
+    ax = fig.subplots()
     bars = ax.bar(["Standard", "Free/Reduced"], means.round(2), color=["#4C72B0", "#55A868"])
     for bar, value in zip(bars, means.round(2)):
         ax.text(bar.get_x() + bar.get_width() / 2, value + 0.3, f"{value:.1f}", ha="center", va="bottom")
@@ -82,15 +281,22 @@ def v3_lunch_average(df: pd.DataFrame) -> pd.Series:
     ax.set_ylabel("Average Score (0-100)")
     ax.set_ylim(0, 100)
     fig.tight_layout()
-    fig.savefig(FIGURES["v3"], bbox_inches="tight")
-    plt.close(fig)
+    save_figure(fig, output_dir / FIGURE_NAMES["v3"], bbox_inches="tight")
     return means
 
 
-def v4_subject_correlation(df: pd.DataFrame) -> pd.DataFrame:
-    subjects = ["math score", "reading score", "writing score"]
-    corr = df[subjects].corr()
-    fig, ax = plt.subplots(figsize=(8, 6), dpi=300)
+@instrumented("v4_subject_correlation")
+@cached_stage(outputs=lambda args: [args["output_dir"] / FIGURE_NAMES["v4"]])
+def v4_subject_correlation(
+    df: pd.DataFrame,
+    stats: Optional[Dict[str, GroupedStats]] = None,
+    output_dir: Path = OUTPUT_DIR,
+    large_rows: int = LARGE_DATA_ROWS,
+) -> pd.DataFrame:
+    subjects = SUBJECTS
+    corr = subject_correlation(df)
+    fig = new_figure()
+    ax = fig.subplots()
     cax = ax.imshow(corr, cmap="coolwarm", vmin=-1, vmax=1)
     ax.set_xticks(range(len(subjects)))
     ax.set_yticks(range(len(subjects)))
@@ -103,57 +309,130 @@ def v4_subject_correlation(df: pd.DataFrame) -> pd.DataFrame:
     fig.colorbar(cax, ax=ax, fraction=0.046, pad=0.04)
     ax.set_title("Correlation Among Subject Scores")
     fig.tight_layout()
-    fig.savefig(FIGURES["v4"], bbox_inches="tight")
-    plt.close(fig)
+    save_figure(fig, output_dir / FIGURE_NAMES["v4"], bbox_inches="tight")
     return corr
 
 
-def v5_scatter_trend(df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
-    order = ["completed", "none"]
+@instrumented("v5_scatter_trend")
+@cached_stage(outputs=lambda args: [args["output_dir"] / FIGURE_NAMES["v5"]])
+def v5_scatter_trend(
+    df: pd.DataFrame,
+    stats: Optional[Dict[str, GroupedStats]] = None,
+    output_dir: Path = OUTPUT_DIR,
+    large_rows: int = LARGE_DATA_ROWS,
+) -> Dict[str, Dict[str, float]]:
     colors = {"completed": "#C44E52", "none": "#8172B2"}
-    stats: Dict[str, Dict[str, float]] = {}
-    fig, ax = plt.subplots(figsize=(8, 6), dpi=300)
+    large = len(df) >= large_rows
+    trend = trend_statistics(df, stats, large_rows)
+    engine = group_engine(df, stats, "test preparation course")
+    reading = engine.split("reading score")
+    math = engine.split("math score")
+    handles = []
+    fig = new_figure()
+    ax = fig.subplots()
     x_min, x_max = df["reading score"].min(), df["reading score"].max()
     x_range = np.linspace(x_min, x_max, 100)
-    for group in order:
-        subset = df[df["test preparation course"] == group]
-        label = f"{group.title()} (n={len(subset)})"
-        ax.scatter(subset["reading score"], subset["math score"], label=label, color=colors[group], alpha=0.6, edgecolors="black", linewidths=0.5)
-        if len(subset) >= 2:
-            slope, intercept = np.polyfit(subset["reading score"], subset["math score"], 1)
-            stats[group] = {"slope": slope, "intercept": intercept, "n": len(subset)}
-            ax.plot(x_range, slope * x_range + intercept, color=colors[group], linestyle="--")
+    for group in TREND_GROUPS:
+        x, y = reading.get(group, np.array([])), math.get(group, np.array([]))
+        label = f"{group.title()} (n={len(x)})"
+        if large:
+            handles.append(density_layer(ax, x, y, colors[group], label))
         else:
-            stats[group] = {"slope": np.nan, "intercept": np.nan, "n": len(subset)}
+            ax.scatter(x, y, label=label, color=colors[group], alpha=0.6, edgecolors="black", linewidths=0.5)
+        if len(x) >= 2:
+            slope, intercept = trend[group]["slope"], trend[group]["intercept"]
+            ax.plot(x_range, slope * x_range + intercept, color=colors[group], linestyle="--")
     ax.set_title("Math vs. Reading Scores by Test Preparation Status")
     ax.set_xlabel("Reading Score (0-100)")
     ax.set_ylabel("Math Score (0-100)")
-    ax.legend()
+    if large:
+        ax.legend(handles=handles)
+    else:
+        ax.legend()
     ax.grid(True, linestyle=":", alpha=0.4)
     fig.tight_layout()
-    fig.savefig(FIGURES["v5"], bbox_inches="tight")
-    plt.close(fig)
-    return stats
-
-
-def generate_figures(df: pd.DataFrame) -> Dict[str, object]:
-    ensure_output_dirs()
-    v1_gender_boxplots(df)
-    v2_testprep_math(df)
-    lunch_means = v3_lunch_average(df)
-    corr = v4_subject_correlation(df)
-    trend_stats = v5_scatter_trend(df)
-    return {"lunch_means": lunch_means, "corr": corr, "trend_stats": trend_stats}
-
+    save_figure(fig, output_dir / FIGURE_NAMES["v5"], bbox_inches="tight")
+    return trend
 
-def build_narrative(df: pd.DataFrame, artifacts: Dict[str, object]) -> str:
-    math_stats = df.groupby("gender")["math score"].agg(["median", "mean"]).round(1)
-    reading_stats = df.groupby("gender")["reading score"].agg(["median", "mean"]).round(1)
-    math_quartiles = df.groupby("gender")["math score"].quantile([0.25, 0.75]).unstack().round(1)
-    reading_quartiles = df.groupby("gender")["reading score"].quantile([0.75]).unstack().round(1)
-    math_mins = df.groupby("gender")["math score"].min()
 
-    prep_math = df.groupby("test preparation course")["math score"].agg(["mean", "median", "count"]).round(1)
+FIGURE_FUNCTIONS = {
+    "v1": v1_gender_boxplots,
+    "v2": v2_testprep_math,
+    "v3": v3_lunch_average,
+    "v4": v4_subject_correlation,
+    "v5": v5_scatter_trend,
+}
+ARTIFACT_KEYS = {"v3": "lunch_means", "v4": "corr", "v5": "trend_stats"}
+
+
+def render_figure(
+    name: str,
+    df: pd.DataFrame,
+    stats: Optional[Dict[str, GroupedStats]] = None,
+    output_dir: Path = OUTPUT_DIR,
+    large_rows: int = LARGE_DATA_ROWS,
+) -> object:
+    return FIGURE_FUNCTIONS[name](df, stats, output_dir, large_rows)
+
+
+@instrumented("generate_figures")
+def generate_figures(
+    df: pd.DataFrame,
+    workers: int = 1,
+    stats: Optional[Dict[str, GroupedStats]] = None,
+    output_dir: Path = OUTPUT_DIR,
+    large_rows: int = LARGE_DATA_ROWS,
+) -> Dict[str, object]:
+    """Render V1-V5, in a process pool when ``workers`` > 1 (0 uses every core).
+
+    Each figure owns its ``Figure`` object on the Agg canvas, so serial and
+    parallel runs write byte-identical PNGs. From ``large_rows`` rows on the
+    figures use aggregated rendering.
+    """
+    ensure_output_dirs(output_dir)
+    names = list(FIGURE_FUNCTIONS)
+    workers = min(workers or os.cpu_count() or 1, len(names))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            repeat = len(names)
+            rendered = pool.map(
+                call_recorded, [worker_context()] * repeat, [render_figure] * repeat, names,
+                [df] * repeat, [stats] * repeat, [output_dir] * repeat, [large_rows] * repeat,
+            )
+            results = {}
+            for name, (result, records) in zip(names, rendered):
+                # The figure stages ran in the workers; record them in this run's manifest.
+                merge_worker(records)
+                results[name] = result
+    else:
+        results = {name: render_figure(name, df, stats, output_dir, large_rows) for name in names}
+    return {key: results[name] for name, key in ARTIFACT_KEYS.items()}
+
+
+@instrumented("build_narrative")
+def build_narrative(
+    df: pd.DataFrame,
+    artifacts: Dict[str, object],
+    stats: Optional[Dict[str, GroupedStats]] = None,
+    figure_prefix: str = "../outputs/analysis/",
+    intervals: Optional[Dict[str, Interval]] = None,
+) -> str:
+    intervals = intervals or {}
+
+    def ci(key: str, fmt: str = ".1f") -> str:
+        """`` (95% CI a to b)`` for ``key``, or nothing when intervals were not computed."""
+        return f" ({intervals[key].describe(fmt)})" if key in intervals else ""
+
+    gender = group_engine(df, stats, "gender")
+    math_by_gender = gender.describe("math score")
+    reading_by_gender = gender.describe("reading score")
+    math_stats = math_by_gender[["median", "mean"]].round(1)
+    reading_stats = reading_by_gender[["median", "mean"]].round(1)
+    math_quartiles = math_by_gender[["q1", "q3"]].set_axis([0.25, 0.75], axis=1).round(1)
+    reading_quartiles = reading_by_gender[["q3"]].set_axis([0.75], axis=1).round(1)
+    math_mins = math_by_gender["min"]
+
+    prep_math = group_engine(df, stats, "test preparation course").describe("math score")[["mean", "median", "count"]].round(1)
     lunch_means = artifacts["lunch_means"].round(2)
     corr = artifacts["corr"]
     trend = artifacts["trend_stats"]
@@ -170,6 +449,8 @@ def build_narrative(df: pd.DataFrame, artifacts: Dict[str, object]) -> str:
         iqr_sentence = (
             f"Female math scores span an interquartile range from {math_quartiles.loc['female', 0.25]:.1f} to {math_quartiles.loc['female', 0.75]:.1f}, about {abs_iqr_diff:.1f} points {iqr_phrase} than the male range of {math_quartiles.loc['male', 0.25]:.1f} to {math_quartiles.loc['male', 0.75]:.1f}. "
         )
+    if "math_iqr_gap" in intervals:
+        iqr_sentence += f"Bootstrapping the male-minus-female math IQR gap gives {intervals['math_iqr_gap'].describe()}. "
 
     ingestion_paragraph = (
         "The analysis ingests the raw Kaggle StudentsPerformance dataset, drops records with missing core fields, and engineers an overall average score by combining math, reading, and writing. "
@@ -185,7 +466,7 @@ def build_narrative(df: pd.DataFrame, artifacts: Dict[str, object]) -> str:
     )
 
     v2_text = (
-        f"Students who completed test preparation achieve an average math score of {prep_math.loc['completed', 'mean']:.1f}, about {prep_math.loc['completed', 'mean'] - prep_math.loc['none', 'mean']:.1f} points above those without preparation. "
+        f"Students who completed test preparation achieve an average math score of {prep_math.loc['completed', 'mean']:.1f}, about {prep_math.loc['completed', 'mean'] - prep_math.loc['none', 'mean']:.1f} points above those without preparation{ci('prep_math_gain')}. "
         f"The median advantage is similar at {prep_math.loc['completed', 'median'] - prep_math.loc['none', 'median']:.1f} points, and the completed group shows a higher lower-quartile threshold in the boxplot. "
         "Score dispersion tightens for prepared students, suggesting the course lifts the floor as well as the ceiling. "
         "A few low outliers remain among non-participants, hinting at students who may benefit most from intervention. "
@@ -194,7 +475,7 @@ def build_narrative(df: pd.DataFrame, artifacts: Dict[str, object]) -> str:
 
     v3_text = (
         f"Standard-lunch students average {lunch_means['standard']:.1f} across subjects, compared with {lunch_means['free/reduced']:.1f} for the subsidized cohort. "
-        f"The gap of roughly {lunch_means['standard'] - lunch_means['free/reduced']:.1f} points persists despite shared assessments, signalling socioeconomic effects on performance. "
+        f"The gap of roughly {lunch_means['standard'] - lunch_means['free/reduced']:.1f} points{ci('lunch_gap')} persists despite shared assessments, signalling socioeconomic effects on performance. "
         "The bars also highlight how no lunch group approaches the 90-point benchmark, leaving room for enrichment. "
         "Free/reduced lunch students cluster closer to the 70s, indicating greater support needs. "
         "Prioritizing resources for subsidized lunch participants could shrink the observed average deficit."
@@ -214,7 +495,7 @@ def build_narrative(df: pd.DataFrame, artifacts: Dict[str, object]) -> str:
     slope_completed = trend["completed"]["slope"]
     slope_none = trend["none"]["slope"]
     v5_text = (
-        f"Both preparation groups follow upward trends, with completed students gaining {slope_completed:.2f} math points per reading point versus {slope_none:.2f} for non-participants. "
+        f"Both preparation groups follow upward trends, with completed students gaining {slope_completed:.2f} math points per reading point{ci('slope_completed', '.2f')} versus {slope_none:.2f}{ci('slope_none', '.2f')} for non-participants. "
         "Prepared students cluster higher across the plane, rarely dropping below 60 in math when reading scores exceed 70. "
         "Non-prepared students show broader scatter and more cases dipping under the regression line, hinting at inconsistent math follow-through. "
         f"Legends reveal {trend['completed']['n']} prepared students versus {trend['none']['n']} without preparation, so the uplift is supported by sizable samples. "
@@ -226,45 +507,127 @@ def build_narrative(df: pd.DataFrame, artifacts: Dict[str, object]) -> str:
         ingestion_paragraph,
         "",
         "### V1: Gender Score Distribution",
-        "![](../outputs/analysis/v1_gender_boxplots.png)",
+        f"![]({figure_prefix}v1_gender_boxplots.png)",
         v1_text,
         "",
         "### V2: Test Preparation and Math Outcomes",
-        "![](../outputs/analysis/v2_testprep_math.png)",
+        f"![]({figure_prefix}v2_testprep_math.png)",
         v2_text,
         "",
         "### V3: Lunch Type and Overall Average",
-        "![](../outputs/analysis/v3_lunch_avg.png)",
+        f"![]({figure_prefix}v3_lunch_avg.png)",
         v3_text,
         "",
         "### V4: Subject Correlation Heatmap",
-        "![](../outputs/analysis/v4_subject_corr.png)",
+        f"![]({figure_prefix}v4_subject_corr.png)",
         v4_text,
         "",
         "### V5: Math vs Reading with Trend Lines",
-        "![](../outputs/analysis/v5_scatter_trend_testprep.png)",
+        f"![]({figure_prefix}v5_scatter_trend_testprep.png)",
         v5_text,
     ]
     return "\n".join(lines).strip()
 
-def update_report(report_section: str) -> None:
+@instrumented("update_report")
+def update_report(report_section: str, report_path: Path = REPORT_PATH) -> None:
     existing = ""
-    if REPORT_PATH.exists():
-        existing = REPORT_PATH.read_text(encoding="utf-8")
+    current = ""
+    if report_path.exists():
+        current = report_path.read_text(encoding="utf-8")
         pattern = re.compile(r"## Student Performance Analysis[\s\S]*?(?=\n## |\Z)")
-        existing = pattern.sub("", existing).strip()
+        existing = pattern.sub("", current).strip()
     if existing:
         existing = existing.rstrip() + "\n\n"
-    REPORT_PATH.write_text(existing + report_section + "\n", encoding="utf-8")
+    updated = existing + report_section + "\n"
+    if updated != current:
+        write_text(report_path, updated)
+
+
+def run_visualizations(
+    fmt: Optional[str] = None,
+    workers: int = 1,
+    raw_path: Path = RAW_PATH,
+    output_dir: Path = OUTPUT_DIR,
+    report_path: Path = REPORT_PATH,
+    processed_base: Path = PROCESSED_BASE,
+    large_rows: int = LARGE_DATA_ROWS,
+    summary_only: bool = False,
+    bootstrap: Optional[Bootstrap] = None,
+) -> None:
+    """Render V1-V5 and refresh the report section; ``summary_only`` refreshes the text without plotting.
+
+    With ``bootstrap`` (and a positive resample count) the narrative reports confidence intervals.
+    """
+    df = ingest_and_process(fmt, raw_path, processed_base)
+    stats = grouped_stats(df, GROUP_KEYS)
+    if summary_only:
+        artifacts = summary_artifacts(df, stats, large_rows)
+    else:
+        artifacts = generate_figures(df, workers, stats, output_dir, large_rows)
+    intervals = narrative_intervals(df, bootstrap) if bootstrap is not None and bootstrap.resamples > 0 else None
+    figure_prefix = Path(os.path.relpath(output_dir, report_path.parent)).as_posix() + "/"
+    section = build_narrative(df, artifacts, stats, figure_prefix, intervals)
+    # Figures may still be encoding in the background; the report must only link finished files.
+    barrier()
+    update_report(section, report_path)
+
+
+def main(
+    fmt: Optional[str] = None,
+    workers: int = 1,
+    large_rows: int = LARGE_DATA_ROWS,
+    summary_only: bool = False,
+    bootstrap: Optional[Bootstrap] = None,
+) -> None:
+    with async_writes():
+        run_visualizations(fmt, workers, large_rows=large_rows, summary_only=summary_only, bootstrap=bootstrap)
+    if summary_only:
+        print("Student performance summary updated (figures skipped).")
+    else:
+        print("Student performance visualizations generated successfully.")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--from-processed",
+        choices=sorted(FORMATS),
+        default=None,
+        help="read the pipeline's processed artifact in this format instead of re-parsing the raw CSV",
+    )
+    parser.add_argument("--force", action="store_true", help="re-render every figure even when its cache entry is fresh")
+    parser.add_argument("--workers", type=int, default=1, help="processes used to render figures (0 = all cores)")
+    parser.add_argument(
+        "--large-rows",
+        type=int,
+        default=LARGE_DATA_ROWS,
+        help="row count from which figures switch to aggregated large-data rendering (0 = always)",
+    )
+    parser.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="compute the statistics and refresh the report text without rendering figures (matplotlib is never imported)",
+    )
+    parser.add_argument(
+        "--bootstrap-resamples",
+        type=int,
+        default=DEFAULT_RESAMPLES,
+        help="bootstrap resamples behind the narrative's confidence intervals (0 = report point estimates only)",
+    )
+    parser.add_argument("--bootstrap-workers", type=int, default=1, help="processes drawing bootstrap resamples")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="bootstrap seed; intervals do not depend on the worker count")
+    parser.add_argument("--profile-stage", default=None, help="profile this stage (e.g. build_narrative) and save the profile next to the manifest")
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile")
+    return parser.parse_args(argv)
 
 
-def main() -> None:
-    df = ingest_and_process()
-    artifacts = generate_figures(df)
-    section = build_narrative(df, artifacts)
-    update_report(section)
-    print("Student performance visualizations generated successfully.")
+def run_cli(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    stage_cache.configure(force=args.force)
+    bootstrap = Bootstrap(args.bootstrap_resamples, seed=args.seed, workers=args.bootstrap_workers)
+    with run_manifest("students_viz", OUTPUT_DIR / MANIFEST_NAME, args.profile_stage, args.profiler), bootstrap:
+        main(args.from_processed, args.workers, args.large_rows, args.summary_only, bootstrap)
 
 
 if __name__ == "__main__":
-    main()
+    run_cli()
@@ -0,0 +1,27 @@
+"""Shared fixtures: put ``src/`` and the synthetic generators on the path, and keep the stage cache out of the tree."""
+from pathlib import Path
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT / "benchmarks"))
+
+import stage_cache  # noqa: E402
+from synthetic import synthetic_students  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_stage_cache():
+    stage_cache.configure(enabled=False)
+    yield
+    stage_cache.configure(enabled=True)
+
+
+@pytest.fixture
+def students_csv(tmp_path: Path) -> Path:
+    """A seeded 5,000-row raw students CSV."""
+    path = tmp_path / "students_performance.csv"
+    synthetic_students(5_000, seed=7).to_csv(path, index=False)
+    return path
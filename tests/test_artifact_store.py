@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from artifact_store import FORMATS, TableWriter, read_table, write_table
+
+DTYPES = {"label": "category", "score": "int8", "flag": "int8"}
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(
+        {
+            "label": pd.Categorical(["a", "b", "a", "c", "b"]),
+            "score": pd.Series([10, 55, 90, 3, 71], dtype="int8"),
+            "flag": pd.Series([1, None, 0, 1, None], dtype="Int8"),
+            "value": [0.5, 1.5, 2.5, 3.5, 4.5],
+        }
+    )
+
+
+@pytest.mark.parametrize("fmt", sorted(FORMATS))
+def test_round_trip_keeps_compact_dtypes(frame, tmp_path, fmt):
+    path = write_table(frame, tmp_path / "table", fmt, DTYPES)
+    assert path == tmp_path / f"table{FORMATS[fmt]}"
+    result = read_table(tmp_path / "table", fmt, dtypes=DTYPES)
+    assert isinstance(result["label"].dtype, pd.CategoricalDtype)
+    assert list(result["label"]) == list(frame["label"])
+    assert result["score"].dtype == "int8"
+    # A gap in an int8 column falls back to the nullable Int8.
+    assert result["flag"].dtype == "Int8"
+    assert result["flag"].isna().tolist() == frame["flag"].isna().tolist()
+    assert result["value"].tolist() == frame["value"].tolist()
+
+
+@pytest.mark.parametrize("fmt", sorted(FORMATS))
+def test_projection_and_filters(frame, tmp_path, fmt):
+    write_table(frame, tmp_path / "table", fmt, DTYPES)
+    result = read_table(
+        tmp_path / "table", fmt, columns=["score"], filters=[("label", "in", ["a", "b"]), ("score", ">", 20)], dtypes=DTYPES
+    )
+    assert list(result.columns) == ["score"]
+    assert result["score"].tolist() == [55, 90, 71]
+
+
+@pytest.mark.parametrize("fmt", sorted(FORMATS))
+def test_table_writer_matches_write_table(frame, tmp_path, fmt):
+    with TableWriter(tmp_path / "chunked", fmt, DTYPES) as writer:
+        writer.write(frame.iloc[:2])
+        assert not writer.path.exists()  # renamed into place only on close
+        writer.write(frame.iloc[2:])
+    write_table(frame, tmp_path / "whole", fmt, DTYPES)
+    chunked = read_table(tmp_path / "chunked", fmt, dtypes=DTYPES)
+    whole = read_table(tmp_path / "whole", fmt, dtypes=DTYPES)
+    pd.testing.assert_frame_equal(chunked, whole, check_categorical=False)
+
+
+def test_failed_stream_keeps_previous_artifact(frame, tmp_path):
+    write_table(frame, tmp_path / "table", "csv", DTYPES)
+    before = (tmp_path / "table.csv").read_bytes()
+    with pytest.raises(RuntimeError), TableWriter(tmp_path / "table", "csv", DTYPES) as writer:
+        writer.write(frame.iloc[:1])
+        raise RuntimeError("stream failed")
+    assert (tmp_path / "table.csv").read_bytes() == before
+    assert [path.name for path in tmp_path.iterdir()] == ["table.csv"]
+
+
+def test_unknown_filter_operator(frame, tmp_path):
+    write_table(frame, tmp_path / "table", "csv", DTYPES)
+    with pytest.raises(ValueError):
+        read_table(tmp_path / "table", "csv", filters=[("score", "~", 1)])
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bootstrap import (
+    Bootstrap,
+    _weighted_quantile,
+    compress,
+    correlation,
+    iqr_difference,
+    mean_difference,
+    slope,
+    table_from_counts,
+)
+
+
+def _iqr(values: np.ndarray) -> float:
+    q1, q3 = np.quantile(values, [0.25, 0.75])
+    return q3 - q1
+
+
+@pytest.mark.parametrize("q", [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0])
+def test_weighted_quantile_matches_numpy(q):
+    rng = np.random.default_rng(0)
+    values = np.array([1.0, 2.5, 4.0, 7.0, 9.0])
+    weights = rng.integers(0, 6, size=(50, len(values))).astype("float64")
+    weights[:, 2] += 1  # every row keeps at least one value
+    result = _weighted_quantile(weights, values, q)
+    expected = [np.quantile(np.repeat(values, row.astype(int)), q) for row in weights]
+    np.testing.assert_allclose(result, expected)
+
+
+def test_weighted_quantile_of_empty_row_is_nan():
+    assert np.isnan(_weighted_quantile(np.zeros((1, 3)), np.array([1.0, 2.0, 3.0]), 0.5))[0]
+
+
+def test_compress_counts_unique_rows_and_drops_missing():
+    table, counts = compress([2, 1, 2, np.nan, 1, 2], [5, 5, 5, 1, 6, 5])
+    np.testing.assert_array_equal(table, [[1, 5], [1, 6], [2, 5]])
+    np.testing.assert_array_equal(counts, [1, 1, 3])
+    again, again_counts = table_from_counts({(1.0, 5.0): 1, (2.0, 5.0): 3, (1.0, 6.0): 1})
+    np.testing.assert_array_equal(again, table)
+    np.testing.assert_array_equal(again_counts, counts)
+
+
+@pytest.fixture
+def sample():
+    rng = np.random.default_rng(5)
+    flag = rng.integers(0, 2, 400)
+    value = rng.integers(0, 101, 400).astype("float64") + 3 * flag
+    return flag, value
+
+
+def test_statistics_at_observed_counts_match_pandas(sample):
+    flag, value = sample
+    table, counts = compress(flag, value)
+    weights = counts[None, :].astype("float64")
+    ones, zeros = value[flag == 1], value[flag == 0]
+    assert mean_difference(weights, table)[0] == pytest.approx(ones.mean() - zeros.mean())
+    assert iqr_difference(weights, table)[0] == pytest.approx(_iqr(ones) - _iqr(zeros))
+    x, y = pd.Series(value), pd.Series(value * 0.5 + flag * 10)
+    pairs, pair_counts = compress(x, y)
+    pair_weights = pair_counts[None, :].astype("float64")
+    assert slope(pair_weights, pairs)[0] == pytest.approx(np.polyfit(x, y, 1)[0])
+    assert correlation(pair_weights, pairs)[0] == pytest.approx(x.corr(y))
+
+
+def test_interval_brackets_estimate_and_ignores_worker_count(sample):
+    flag, value = sample
+    serial = Bootstrap(resamples=2_000, seed=3).interval(mean_difference, flag, value)
+    with Bootstrap(resamples=2_000, seed=3, workers=2) as parallel:
+        pooled = parallel.interval(mean_difference, flag, value)
+    assert serial == pooled
+    assert serial.low < serial.estimate < serial.high
+    assert serial.resamples <= 2_000
+
+
+def test_no_resamples_gives_point_estimate(sample):
+    interval = Bootstrap(resamples=0).interval(mean_difference, *sample)
+    assert np.isnan(interval.low) and np.isnan(interval.high)
+    assert interval.resamples == 0
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pytest
+
+from artifact_store import artifact_path
+import frailty_workflow
+from synthetic import synthetic_frailty
+
+
+@pytest.fixture
+def workflow(tmp_path, monkeypatch):
+    """Point every path ``run_incremental`` touches into ``tmp_path``; returns the raw CSV path."""
+    processed, reports = tmp_path / "processed", tmp_path / "reports"
+    monkeypatch.setattr(frailty_workflow, "RAW_PATH", tmp_path / "frailty_data.csv")
+    monkeypatch.setattr(frailty_workflow, "PROCESSED_BASE", processed / "frailty_processed")
+    monkeypatch.setattr(frailty_workflow, "STATE_PATH", processed / "frailty_state.json")
+    monkeypatch.setattr(frailty_workflow, "QUARANTINE_PATH", processed / "frailty_quarantine.csv")
+    monkeypatch.setattr(frailty_workflow, "REPORTS_DIR", reports)
+    monkeypatch.setattr(frailty_workflow, "FINDINGS_PATH", reports / "findings.md")
+    return tmp_path / "frailty_data.csv"
+
+
+def raw_lines(rows: int, seed: int = 3) -> list:
+    return synthetic_frailty(rows, seed).to_csv(index=False).splitlines(keepends=True)
+
+
+def rebuild(raw: Path) -> str:
+    """Findings from a from-scratch run over the whole of ``raw``."""
+    frailty_workflow.STATE_PATH.unlink()
+    frailty_workflow.run_incremental(raw)
+    return frailty_workflow.FINDINGS_PATH.read_text()
+
+
+def test_appended_rows_match_full_rebuild(workflow):
+    lines = raw_lines(600)
+    workflow.write_text("".join(lines[:401]))
+    assert frailty_workflow.run_incremental(workflow) == 400
+    with open(workflow, "a") as handle:
+        handle.writelines(lines[401:])
+    assert frailty_workflow.run_incremental(workflow) == 200
+    assert frailty_workflow.run_incremental(workflow) == 0
+    incremental = frailty_workflow.FINDINGS_PATH.read_text()
+    assert rebuild(workflow) == incremental
+
+
+def test_rewritten_prefix_forces_rebuild(workflow):
+    lines = raw_lines(300)
+    workflow.write_text("".join(lines))
+    frailty_workflow.run_incremental(workflow)
+    # Same size, different first row: only the prefix digest can tell.
+    edited = lines[1].replace(",N\n", ",Y\n") if lines[1].endswith(",N\n") else lines[1].replace(",Y\n", ",N\n")
+    workflow.write_text("".join([lines[0], edited, *lines[2:]]))
+    assert frailty_workflow.run_incremental(workflow) == 300
+    incremental = frailty_workflow.FINDINGS_PATH.read_text()
+    assert rebuild(workflow) == incremental
+
+
+def test_half_written_line_waits_for_next_run(workflow):
+    lines = raw_lines(100)
+    last = lines[-1]
+    workflow.write_text("".join(lines[:-1]) + last[:5])
+    assert frailty_workflow.run_incremental(workflow) == 99
+    processed = artifact_path(frailty_workflow.PROCESSED_BASE, "csv")
+    state = frailty_workflow._load_state(workflow, lines[0].strip(), frailty_workflow.FEATURE_FLOAT_DTYPE, processed)
+    assert state is not None and state.rows == 99
+    assert state.byte_offset == len("".join(lines[:-1]).encode())
+    with open(workflow, "a") as handle:
+        handle.write(last[5:])
+    assert frailty_workflow.run_incremental(workflow) == 1
+    incremental = frailty_workflow.FINDINGS_PATH.read_text()
+    assert rebuild(workflow) == incremental
+
+
+def test_whole_measurements_keep_their_raw_spelling(workflow):
+    lines = raw_lines(50)
+    workflow.write_text("".join(lines))
+    frailty_workflow.run_incremental(workflow)
+    with open(workflow, "a") as handle:
+        handle.write("66.1,150.4,40,27.5,N\n")
+    frailty_workflow.run_incremental(workflow)
+    processed = artifact_path(frailty_workflow.PROCESSED_BASE, "csv").read_text(encoding="utf-8").splitlines()
+    raw = [line.split(",")[:4] for line in lines[1:]]
+    assert [line.split(",")[:4] for line in processed[1:51]] == raw
+    assert processed[-1].startswith("66.1,150.4,40,27.5,N,")
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from grouped_stats import GroupedStats
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    rows = 2_000
+    df = pd.DataFrame(
+        {
+            "group": rng.choice(np.array(["b", "a", "c"], dtype=object), rows),
+            "x": rng.integers(0, 100, rows).astype("float64"),
+            "y": rng.normal(50, 10, rows),
+        }
+    )
+    df.loc[rng.choice(rows, 50, replace=False), "group"] = None
+    df.loc[rng.choice(rows, 40, replace=False), "y"] = np.nan
+    return df
+
+
+def test_describe_matches_groupby(frame):
+    grouped = frame.groupby("group")["y"]
+    expected = pd.DataFrame(
+        {
+            "count": grouped.count(),
+            "mean": grouped.mean(),
+            "median": grouped.median(),
+            "q1": grouped.quantile(0.25),
+            "q3": grouped.quantile(0.75),
+            "min": grouped.min(),
+            "max": grouped.max(),
+        }
+    )
+    pd.testing.assert_frame_equal(GroupedStats(frame, "group").describe("y"), expected, check_dtype=False)
+
+
+def test_regression_matches_polyfit(frame):
+    fits = GroupedStats(frame, "group").regression("x", "y")
+    for label, rows in frame.dropna().groupby("group"):
+        slope, intercept = np.polyfit(rows["x"], rows["y"], 1)
+        assert fits.loc[label, "slope"] == pytest.approx(slope)
+        assert fits.loc[label, "intercept"] == pytest.approx(intercept)
+        assert fits.loc[label, "n"] == len(rows)
+
+
+def test_split_keeps_row_order(frame):
+    parts = GroupedStats(frame, "group").split("x")
+    assert list(parts) == ["a", "b", "c"]
+    for label, values in parts.items():
+        np.testing.assert_array_equal(values, frame.loc[frame["group"] == label, "x"].to_numpy())
+
+
+def test_regression_needs_two_points():
+    df = pd.DataFrame({"group": ["a", "b", "b"], "x": [1.0, 1.0, 2.0], "y": [3.0, 1.0, 3.0]})
+    fits = GroupedStats(df, "group").regression("x", "y")
+    assert np.isnan(fits.loc["a", "slope"])
+    assert fits.loc["b", "slope"] == pytest.approx(2.0)
@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from output_writer import OutputWriter, async_writes, write_text
+
+
+def gated_write(gate: threading.Event, text: str):
+    """A write that blocks until ``gate`` is set."""
+    def write(tmp):
+        assert gate.wait(5)
+        tmp.write_text(text)
+    return write
+
+
+@pytest.fixture
+def writer():
+    writer = OutputWriter(workers=2)
+    yield writer
+    writer.close()
+
+
+def test_after_runs_once_its_writes_finish(writer, tmp_path):
+    gate = threading.Event()
+    path = tmp_path / "figure.txt"
+    writer.submit(path, gated_write(gate, "done"))
+    seen = writer.after([path], lambda: path.read_text())
+    assert not seen.done()
+    assert not path.exists()
+    gate.set()
+    assert seen.result(5) == "done"
+
+
+def test_after_does_not_wait_for_other_paths(writer, tmp_path):
+    gate = threading.Event()
+    writer.submit(tmp_path / "slow.txt", gated_write(gate, "slow"))
+    writer.submit(tmp_path / "fast.txt", lambda tmp: tmp.write_text("fast"))
+    assert writer.after([tmp_path / "fast.txt"], lambda: "ran").result(5) == "ran"
+    assert not (tmp_path / "slow.txt").exists()
+    gate.set()
+
+
+def test_barrier_waits_for_writes_and_followups(writer, tmp_path):
+    gate = threading.Event()
+    paths = [tmp_path / f"{index}.txt" for index in range(4)]
+    for path in paths:
+        writer.submit(path, gated_write(gate, path.stem))
+    followup = writer.after(paths, lambda: sorted(path.read_text() for path in paths))
+    threading.Timer(0.05, gate.set).start()
+    writer.barrier()
+    assert all(path.exists() for path in paths)
+    assert followup.done() and followup.result() == ["0", "1", "2", "3"]
+
+
+def test_failed_write_keeps_old_file_and_raises_from_wait(tmp_path):
+    writer = OutputWriter(workers=2)
+    path = tmp_path / "report.md"
+    path.write_text("old")
+
+    def failing(tmp):
+        tmp.write_text("half")
+        raise OSError("disk full")
+
+    writer.submit(path, failing)
+    followup = writer.after([path], lambda: "ran")
+    with pytest.raises(OSError, match="disk full"):
+        writer.wait([path])
+    assert path.read_text() == "old"
+    assert [entry.name for entry in tmp_path.iterdir()] == ["report.md"]
+    # Follow-ups of a failed write are skipped and carry its error.
+    with pytest.raises(OSError, match="disk full"):
+        followup.result(5)
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()
+
+
+def test_writes_to_one_path_land_in_order(tmp_path):
+    path = tmp_path / "findings.md"
+    with async_writes():
+        for index in range(20):
+            write_text(path, str(index))
+    assert path.read_text() == "19"
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+import pipeline
+
+
+@pytest.mark.parametrize("chunksize", [1, 733, 10_000])
+def test_streaming_matches_in_memory(students_csv, tmp_path, chunksize):
+    if chunksize == 1:
+        # One-row chunks are slow; a short prefix still exercises every merge.
+        head = pd.read_csv(students_csv).head(200)
+        students_csv = tmp_path / "head.csv"
+        head.to_csv(students_csv, index=False)
+    frame_dir, stream_dir = tmp_path / "frame", tmp_path / "stream"
+    expected = pipeline.run_pipeline(students_csv, processed_dir=frame_dir, analysis_dir=frame_dir)
+    actual = pipeline.run_pipeline(
+        students_csv, streaming=True, chunksize=chunksize, processed_dir=stream_dir, analysis_dir=stream_dir
+    )
+    for want, got in zip(expected, actual):
+        # The in-memory path groups by the categorical column; compare the labels, not the index class.
+        want.index, got.index = want.index.astype(str), got.index.astype(str)
+        pd.testing.assert_frame_equal(got, want, check_dtype=False)
+    processed = pipeline.PROCESSED_NAME + ".csv"
+    assert (stream_dir / processed).read_bytes() == (frame_dir / processed).read_bytes()
+    assert (stream_dir / "analysis_report.md").read_text() == (frame_dir / "analysis_report.md").read_text()
+
+
+def test_analyze_matches_pandas(students_csv, tmp_path):
+    score_summary, prep_course = pipeline.run_pipeline(students_csv, processed_dir=tmp_path, analysis_dir=tmp_path)
+    raw = pd.read_csv(students_csv)
+    average = raw[["math score", "reading score", "writing score"]].mean(axis=1)
+    assert score_summary.loc["mean", "average_score"] == round(average.mean(), 2)
+    assert score_summary.loc["std", "math_score"] == round(raw["math score"].std(), 2)
+    counts = raw["test preparation course"].value_counts()
+    assert prep_course["count"].to_dict() == counts.to_dict()
+
+
+def test_cached_ingest_restores_quarantine_presence(students_csv, tmp_path):
+    import stage_cache
+    from schema import STUDENTS_SCHEMA, quarantine_path
+
+    stage_cache.configure(enabled=True, cache_dir=tmp_path / "cache")
+    try:
+        processed = tmp_path / "processed"
+        quarantine = quarantine_path(processed, STUDENTS_SCHEMA.name)
+        clean = students_csv.read_text()
+        dirty = clean.rstrip("\n") + "\nfemale,group Z,high school,standard,none,50,60,70\n"
+        for text, expect_file in [(dirty, True), (clean, False), (dirty, True), (clean, False)]:
+            students_csv.write_text(text)
+            # The second pass over each content is a cache hit.
+            pipeline.ingest(students_csv, processed_dir=processed)
+            assert quarantine.exists() == expect_file
+    finally:
+        stage_cache.configure(enabled=False, cache_dir=stage_cache.CACHE_DIR)
@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pipeline
+from score_cube import CUBE_SCORES, META_FILE, CubeBuilder, ScoreCube, build_cube
+from synthetic import synthetic_students
+
+
+@pytest.fixture
+def processed():
+    return pipeline.derive_columns(synthetic_students(4_000, seed=21))
+
+
+@pytest.fixture
+def cube(processed, tmp_path):
+    return build_cube(processed, tmp_path)
+
+
+def _expected(frame: pd.DataFrame, by, score: str) -> pd.DataFrame:
+    grouped = frame.groupby(by, observed=True)[score]
+    return pd.DataFrame(
+        {"count": grouped.count(), "mean": grouped.mean(), "std": grouped.std(), "median": grouped.median()}
+    )
+
+
+@pytest.mark.parametrize(
+    "by, score",
+    [
+        (["lunch"], "average_score"),
+        (["gender", "lunch", "race_ethnicity"], "average_score"),
+        (["parental_education", "test_preparation_course"], "math_score"),
+        (["race_ethnicity", "gender"], "writing_score"),
+    ],
+)
+def test_rollup_matches_groupby(processed, cube, by, score):
+    result = cube.rollup(by, score)
+    expected = _expected(processed, by, score)
+    assert list(result.index) == list(expected.index)
+    np.testing.assert_array_equal(result["count"], expected["count"])
+    for column in ("mean", "std", "median"):
+        np.testing.assert_allclose(result[column], expected[column], rtol=1e-12)
+
+
+def test_slice_then_rollup(processed, cube):
+    result = cube.slice(lunch="standard", gender=["female"]).rollup(["parental_education"], "reading_score")
+    rows = processed[(processed["lunch"] == "standard") & (processed["gender"] == "female")]
+    expected = _expected(rows, "parental_education", "reading_score")
+    np.testing.assert_allclose(result[["count", "mean", "std", "median"]], expected, rtol=1e-12)
+
+
+def test_summary_matches_analyze(processed, cube):
+    expected = processed[CUBE_SCORES].agg(["mean", "median", "std"])
+    pd.testing.assert_frame_equal(cube.summary(), expected, rtol=1e-12)
+
+
+def test_chunked_build_matches_single_pass(processed, cube, tmp_path):
+    builder = CubeBuilder()
+    for start in range(0, len(processed), 999):
+        builder.update(processed.iloc[start:start + 999])
+    builder.save(tmp_path / "chunked")
+    chunked = ScoreCube.load(tmp_path / "chunked")
+    assert chunked.labels == cube.labels
+    for name, array in cube.arrays.items():
+        np.testing.assert_array_equal(chunked.arrays[name], array)
+
+
+@pytest.mark.parametrize("copies", [10**5, 3 * 10**5])
+def test_large_counts_keep_std_exact(processed, cube, copies):
+    # ``copies`` stacked copies of the data: 400M and 1.2B rows, far past the int64 limit of n * sum of squares.
+    scaled = ScoreCube(cube.labels, {name: array * copies for name, array in cube.arrays.items()})
+    for by in ([], ["lunch"], ["gender", "race_ethnicity"]):
+        small, large = cube.aggregate(by), scaled.aggregate(by)
+        n = small["count"]
+        np.testing.assert_array_equal(large["count"], n * copies)
+        np.testing.assert_allclose(large["mean"], small["mean"], rtol=1e-12)
+        np.testing.assert_array_equal(large["median"], small["median"])
+        # Sample std of k stacked copies: the squared deviations scale by k, the divisor becomes k * n - 1.
+        expected = small["std"] * np.sqrt((n - 1) * copies / (n * copies - 1))
+        np.testing.assert_allclose(large["std"], expected, rtol=1e-9)
+        assert np.isfinite(large["std"][n > 1]).all()
+
+
+def test_older_format_is_rejected(cube, tmp_path):
+    meta_path = tmp_path / META_FILE
+    meta = json.loads(meta_path.read_text())
+    del meta["format_version"]
+    meta_path.write_text(json.dumps(meta))
+    with pytest.raises(ValueError, match="version 1 score cube"):
+        ScoreCube.load(tmp_path)
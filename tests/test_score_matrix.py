@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pipeline
+from score_matrix import SCORES, MatrixWriter, ScoreMatrix
+from synthetic import synthetic_students
+
+
+@pytest.fixture
+def processed():
+    return pipeline.derive_columns(synthetic_students(3_000, seed=11))
+
+
+@pytest.fixture
+def matrix(processed, tmp_path):
+    # Several writes and small read chunks, so every statistic merges across chunks.
+    with MatrixWriter(tmp_path) as writer:
+        for start in range(0, len(processed), 1_000):
+            writer.write(processed.iloc[start:start + 1_000])
+    return ScoreMatrix(tmp_path, chunk_rows=700)
+
+
+def test_summary_matches_pandas(processed, matrix):
+    expected = processed[SCORES + ["average_score"]].agg(["mean", "median", "std"])
+    pd.testing.assert_frame_equal(matrix.summary(), expected, rtol=1e-12)
+
+
+def test_correlation_matches_pandas(processed, matrix):
+    np.testing.assert_allclose(matrix.correlation().to_numpy(), processed[SCORES].corr().to_numpy(), rtol=1e-10)
+
+
+def test_grouped_matches_groupby(processed, matrix):
+    grouped = processed.groupby("lunch", observed=True)["average_score"]
+    result = matrix.grouped("lunch")
+    assert list(result.index) == sorted(grouped.groups)
+    np.testing.assert_array_equal(result["count"], grouped.count())
+    np.testing.assert_allclose(result["mean"], grouped.mean(), rtol=1e-12)
+    np.testing.assert_allclose(result["median"], grouped.median(), rtol=1e-12)
+
+
+def test_regression_matches_polyfit(processed, matrix):
+    fits = matrix.regression("test_preparation_course", "reading_score", "math_score")
+    for group, rows in processed.groupby("test_preparation_course", observed=True):
+        slope, intercept = np.polyfit(rows["reading_score"], rows["math_score"], 1)
+        assert fits.loc[group, "slope"] == pytest.approx(slope)
+        assert fits.loc[group, "intercept"] == pytest.approx(intercept)
+        assert fits.loc[group, "n"] == len(rows)
+
+
+def test_share_above(processed, matrix):
+    assert matrix.share_above(80) == pytest.approx((processed["average_score"] > 80).mean())
+
+
+def test_writer_rejects_out_of_range_scores(processed, tmp_path):
+    bad = processed.head(3).assign(math_score=[10, 101, 20])
+    with pytest.raises(ValueError), MatrixWriter(tmp_path) as writer:
+        writer.write(bad)
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+import stage_cache
+from stage_cache import cached_stage
+
+CALLS = []
+
+
+@cached_stage(outputs=lambda args: [args["directory"] / "out.txt"])
+def write_double(value: int, directory: Path) -> int:
+    CALLS.append(value)
+    (directory / "out.txt").write_text(str(value * 2) * 100)
+    return value * 2
+
+
+@pytest.fixture
+def cache(tmp_path):
+    CALLS.clear()
+    stage_cache.configure(enabled=True, cache_dir=tmp_path / "cache")
+    yield tmp_path / "cache"
+    stage_cache.configure(enabled=False, cache_dir=stage_cache.CACHE_DIR, max_bytes=stage_cache.MAX_CACHE_BYTES)
+
+
+def test_hit_restores_outputs_without_recomputing(cache, tmp_path):
+    out = tmp_path / "out.txt"
+    assert write_double(4, tmp_path) == 8
+    out.write_text("clobbered")
+    assert write_double(4, tmp_path) == 8
+    assert CALLS == [4]
+    assert out.read_text() == "8" * 100
+    # The restore went through a temporary sibling that was renamed away.
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["cache", "out.txt"]
+
+
+def test_changed_argument_misses(cache, tmp_path):
+    write_double(4, tmp_path)
+    write_double(5, tmp_path)
+    assert CALLS == [4, 5]
+
+
+def test_entry_larger_than_store_is_not_written(cache, tmp_path):
+    stage_cache.configure(max_bytes=50)
+    write_double(4, tmp_path)
+    write_double(4, tmp_path)
+    assert CALLS == [4, 4]
+    assert not cache.exists() or not any(cache.iterdir())